@@ -5,6 +5,7 @@ Uses the prometheus_client library
 to create and manage Prometheus metrics.
 """
 
+import threading
 from collections.abc import Iterable
 
 from prometheus_client import Counter as PrometheusCounter
@@ -78,6 +79,8 @@ class PrometheusMetricsFactory(MetricsFactory):
 
     # Dictionary to store created metrics by name.
     _metrics: dict[str, Counter | Gauge | Histogram | Summary] = {}
+    # Resources may be built concurrently, so guard metric creation.
+    _metrics_lock = threading.Lock()
 
     def get_counter(
         self,
@@ -85,10 +88,11 @@ class PrometheusMetricsFactory(MetricsFactory):
         description: str,
         label_names: Iterable[str] = (),
     ) -> Counter:
-        if name not in self._metrics:
-            self._metrics[name] = PrometheusMetricsFactory.Counter(
-                PrometheusCounter(name, description, labelnames=label_names)
-            )
+        with self._metrics_lock:
+            if name not in self._metrics:
+                self._metrics[name] = PrometheusMetricsFactory.Counter(
+                    PrometheusCounter(name, description, labelnames=label_names)
+                )
         counter = self._metrics[name]
         if not isinstance(counter, PrometheusMetricsFactory.Counter):
             raise ValueError(f"{name} is not the name of a Counter")
@@ -101,10 +105,11 @@ class PrometheusMetricsFactory(MetricsFactory):
         description: str,
         label_names: Iterable[str] = (),
     ) -> Gauge:
-        if name not in self._metrics:
-            self._metrics[name] = PrometheusMetricsFactory.Gauge(
-                PrometheusGauge(name, description, labelnames=label_names)
-            )
+        with self._metrics_lock:
+            if name not in self._metrics:
+                self._metrics[name] = PrometheusMetricsFactory.Gauge(
+                    PrometheusGauge(name, description, labelnames=label_names)
+                )
         gauge = self._metrics[name]
         if not isinstance(gauge, PrometheusMetricsFactory.Gauge):
             raise ValueError(f"{name} is not the name of a Gauge")
@@ -117,10 +122,11 @@ class PrometheusMetricsFactory(MetricsFactory):
         description: str,
         label_names: Iterable[str] = (),
     ) -> Histogram:
-        if name not in self._metrics:
-            self._metrics[name] = PrometheusMetricsFactory.Histogram(
-                PrometheusHistogram(name, description, labelnames=label_names)
-            )
+        with self._metrics_lock:
+            if name not in self._metrics:
+                self._metrics[name] = PrometheusMetricsFactory.Histogram(
+                    PrometheusHistogram(name, description, labelnames=label_names)
+                )
         histogram = self._metrics[name]
         if not isinstance(histogram, PrometheusMetricsFactory.Histogram):
             raise ValueError(f"{name} is not the name of a Histogram")
@@ -133,10 +139,11 @@ class PrometheusMetricsFactory(MetricsFactory):
         description: str,
         label_names: Iterable[str] = (),
     ) -> Summary:
-        if name not in self._metrics:
-            self._metrics[name] = PrometheusMetricsFactory.Summary(
-                PrometheusSummary(name, description, labelnames=label_names)
-            )
+        with self._metrics_lock:
+            if name not in self._metrics:
+                self._metrics[name] = PrometheusMetricsFactory.Summary(
+                    PrometheusSummary(name, description, labelnames=label_names)
+                )
         summary = self._metrics[name]
         if not isinstance(summary, PrometheusMetricsFactory.Summary):
             raise ValueError(f"{name} is not the name of a Summary")
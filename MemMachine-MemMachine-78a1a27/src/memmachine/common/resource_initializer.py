@@ -3,7 +3,7 @@ Resource initializer for building resources
 based on their definitions and dependencies.
 """
 
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from memmachine.common.builder import Builder
@@ -92,12 +92,14 @@ class ResourceInitializer:
 
         def order_resources(
             resource_dependency_graph: dict[str, set[str]],
-        ) -> list[str]:
+        ) -> list[list[str]]:
             """
             Order resources based on their dependencies
-            using a topological sort.
+            using a topological sort,
+            grouping resources whose dependencies are all satisfied
+            by earlier groups.
             """
-            ordered_resource_ids = []
+            ordered_resource_id_groups = []
 
             dependency_counts = {
                 resource_id: 0 for resource_id in resource_dependency_graph.keys()
@@ -127,45 +129,70 @@ class ResourceInitializer:
                         dependency_counts[resource_id] += 1
                         dependent_resource_ids[dependency_id].add(resource_id)
 
-            queue = deque(
-                [
-                    resource_id
-                    for resource_id, count in dependency_counts.items()
-                    if count == 0
-                ]
-            )
+            resource_id_group = [
+                resource_id
+                for resource_id, count in dependency_counts.items()
+                if count == 0
+            ]
 
-            while queue:
-                resource_id = queue.popleft()
-                ordered_resource_ids.append(resource_id)
+            while resource_id_group:
+                ordered_resource_id_groups.append(resource_id_group)
 
-                for dependent_resource_id in dependent_resource_ids[resource_id]:
-                    dependency_counts[dependent_resource_id] -= 1
-                    if dependency_counts[dependent_resource_id] == 0:
-                        queue.append(dependent_resource_id)
+                next_resource_id_group = []
+                for resource_id in resource_id_group:
+                    for dependent_resource_id in dependent_resource_ids[resource_id]:
+                        dependency_counts[dependent_resource_id] -= 1
+                        if dependency_counts[dependent_resource_id] == 0:
+                            next_resource_id_group.append(dependent_resource_id)
 
-            if len(ordered_resource_ids) != len(resource_dependency_graph):
-                raise ValueError("Cyclic dependency detected in resource definitions")
+                resource_id_group = next_resource_id_group
 
-            return ordered_resource_ids
+            if sum(map(len, ordered_resource_id_groups)) != len(
+                resource_dependency_graph
+            ):
+                raise ValueError("Cyclic dependency detected in resource definitions")
 
-        ordered_resource_ids = order_resources(resource_dependency_graph)
+            return ordered_resource_id_groups
 
-        initialized_resources: dict[str, Any] = {}
-        for resource_id in ordered_resource_ids:
-            if resource_id in resource_cache:
-                continue
+        ordered_resource_id_groups = order_resources(resource_dependency_graph)
 
+        def build_resource(resource_id: str, injections: dict[str, Any]) -> Any:
             resource_definition = resource_definitions[resource_id]
 
             resource_builder = resource_builder_map[resource_definition["type"]]
 
-            initialized_resource = resource_builder.build(
+            return resource_builder.build(
                 resource_definition["name"],
                 resource_definition["config"],
-                injections=resource_cache | initialized_resources,
+                injections=injections,
             )
 
-            initialized_resources[resource_id] = initialized_resource
+        initialized_resources: dict[str, Any] = {}
+        with ThreadPoolExecutor() as executor:
+            for resource_id_group in ordered_resource_id_groups:
+                resource_ids_to_build = [
+                    resource_id
+                    for resource_id in resource_id_group
+                    if resource_id not in resource_cache
+                ]
+
+                injections = resource_cache | initialized_resources
+
+                # Resources in the same group do not depend on each other,
+                # so build them concurrently
+                # to overlap blocking work such as network handshakes.
+                built_resources = (
+                    [build_resource(resource_ids_to_build[0], injections)]
+                    if len(resource_ids_to_build) == 1
+                    else executor.map(
+                        build_resource,
+                        resource_ids_to_build,
+                        [injections] * len(resource_ids_to_build),
+                    )
+                )
+
+                initialized_resources.update(
+                    zip(resource_ids_to_build, built_resources)
+                )
 
         return initialized_resources
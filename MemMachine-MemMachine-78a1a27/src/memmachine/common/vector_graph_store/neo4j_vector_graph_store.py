@@ -8,7 +8,8 @@ of a vector graph store using Neo4j as the backend database.
 import asyncio
 import logging
 import re
-from collections.abc import Awaitable, Collection, Mapping
+from collections.abc import Awaitable, Callable, Collection, Mapping
+from functools import lru_cache
 from typing import Any, cast
 from uuid import UUID
 
@@ -39,6 +40,11 @@ class Neo4jVectorGraphStoreParams(BaseModel):
         force_exact_similarity_search (bool):
             Whether to force exact similarity search.
             (default: False).
+        vector_index_quantization_enabled (bool | None):
+            Whether to enable int8 quantization
+            for newly created vector indexes.
+            If None, the Neo4j server default is used
+            (default: None).
     """
 
     driver: InstanceOf[AsyncDriver] = Field(
@@ -50,6 +56,10 @@ class Neo4jVectorGraphStoreParams(BaseModel):
     force_exact_similarity_search: bool = Field(
         False, description="Whether to force exact similarity search"
     )
+    vector_index_quantization_enabled: bool | None = Field(
+        None,
+        description="Whether to enable int8 quantization of vector indexes",
+    )
 
 
 # https://neo4j.com/developer/kb/protecting-against-cypher-injection
@@ -75,9 +85,17 @@ class Neo4jVectorGraphStore(VectorGraphStore):
 
         self._semaphore = asyncio.Semaphore(params.max_concurrent_transactions)
         self._force_exact_similarity_search = params.force_exact_similarity_search
+        self._vector_index_quantization_enabled = (
+            params.vector_index_quantization_enabled
+        )
 
         self._vector_index_name_cache: set[str] = set()
 
+        # Cypher text depends only on the shape of a search
+        # (labels, filtered property names, flags),
+        # while the values are passed as query parameters.
+        self._query_cache: dict[tuple, str] = {}
+
     async def add_nodes(self, nodes: Collection[Node]):
         labels_nodes_map: dict[tuple[str, ...], list[Node]] = {}
         for node in nodes:
@@ -160,6 +178,7 @@ class Neo4jVectorGraphStore(VectorGraphStore):
         required_labels: Collection[str] | None = None,
         required_properties: Mapping[str, Property] = {},
         include_missing_properties: bool = False,
+        num_ann_candidates: int | None = None,
     ) -> list[Node]:
         exact_similarity_search = self._force_exact_similarity_search
 
@@ -197,21 +216,34 @@ class Neo4jVectorGraphStore(VectorGraphStore):
                 case _:
                     vector_similarity_function = "vector.similarity.cosine"
 
-            query = (
-                f"MATCH (n{Neo4jVectorGraphStore._format_labels(required_labels)})\n"
-                f"WHERE n.{sanitized_embedding_property_name} IS NOT NULL\n"
-                f"AND {
-                    Neo4jVectorGraphStore._format_required_properties(
-                        'n', required_properties, include_missing_properties
-                    )
-                }\n"
-                "WITH n,"
-                f"    {vector_similarity_function}("
-                f"        n.{sanitized_embedding_property_name}, $query_embedding"
-                "    ) AS similarity\n"
-                "RETURN n\n"
-                "ORDER BY similarity DESC\n"
-                f"{'LIMIT $limit' if limit is not None else ''}"
+            query = self._get_query(
+                (
+                    "search_similar_nodes_exact",
+                    vector_similarity_function,
+                    sanitized_embedding_property_name,
+                    *Neo4jVectorGraphStore._query_shape(
+                        required_labels, required_properties
+                    ),
+                    include_missing_properties,
+                    limit is not None,
+                ),
+                lambda: (
+                    "MATCH"
+                    f"    (n{Neo4jVectorGraphStore._format_labels(required_labels)})\n"
+                    f"WHERE n.{sanitized_embedding_property_name} IS NOT NULL\n"
+                    f"AND {
+                        Neo4jVectorGraphStore._format_required_properties(
+                            'n', required_properties, include_missing_properties
+                        )
+                    }\n"
+                    "WITH n,"
+                    f"    {vector_similarity_function}("
+                    f"        n.{sanitized_embedding_property_name}, $query_embedding"
+                    "    ) AS similarity\n"
+                    "RETURN n\n"
+                    "ORDER BY similarity DESC\n"
+                    f"{'LIMIT $limit' if limit is not None else ''}"
+                ),
             )
 
             async with self._semaphore:
@@ -233,18 +265,32 @@ class Neo4jVectorGraphStore(VectorGraphStore):
                 similarity_metric=similarity_metric,
             )
 
-            query = (
-                "CALL db.index.vector.queryNodes(\n"
-                f"    $vector_index_name, $limit, $query_embedding\n"
-                ")\n"
-                "YIELD node AS n, score AS similarity\n"
-                f"WHERE n{Neo4jVectorGraphStore._format_labels(required_labels)}\n"
-                f"AND {
-                    Neo4jVectorGraphStore._format_required_properties(
-                        'n', required_properties, include_missing_properties
-                    )
-                }\n"
-                "RETURN n"
+            # Neo4j explores the vector index
+            # with a beam as wide as the number of neighbors requested,
+            # so requesting more neighbors than the limit improves recall,
+            # especially when results are filtered afterwards.
+            query = self._get_query(
+                (
+                    "search_similar_nodes_ann",
+                    *Neo4jVectorGraphStore._query_shape(
+                        required_labels, required_properties
+                    ),
+                    include_missing_properties,
+                ),
+                lambda: (
+                    "CALL db.index.vector.queryNodes(\n"
+                    "    $vector_index_name, $num_ann_candidates, $query_embedding\n"
+                    ")\n"
+                    "YIELD node AS n, score AS similarity\n"
+                    f"WHERE n{Neo4jVectorGraphStore._format_labels(required_labels)}\n"
+                    f"AND {
+                        Neo4jVectorGraphStore._format_required_properties(
+                            'n', required_properties, include_missing_properties
+                        )
+                    }\n"
+                    "RETURN n\n"
+                    "LIMIT $limit"
+                ),
             )
 
             async with self._semaphore:
@@ -252,6 +298,7 @@ class Neo4jVectorGraphStore(VectorGraphStore):
                     query,
                     query_embedding=query_embedding,
                     limit=limit,
+                    num_ann_candidates=max(cast(int, limit), num_ann_candidates or 0),
                     required_properties={
                         Neo4jVectorGraphStore._sanitize_name(key): value
                         for key, value in required_properties.items()
@@ -289,21 +336,38 @@ class Neo4jVectorGraphStore(VectorGraphStore):
             async_with(
                 self._semaphore,
                 self._driver.execute_query(
-                    "MATCH\n"
-                    "    (m {uuid: $node_uuid})"
-                    f"    {'-' if find_targets else '<-'}"
-                    f"    {query_typed_relation}"
-                    f"    {'-' if find_sources else '->'}"
-                    f"    (n{Neo4jVectorGraphStore._format_labels(required_labels)})"
-                    f"WHERE {
-                        Neo4jVectorGraphStore._format_required_properties(
-                            'n',
-                            required_properties,
+                    self._get_query(
+                        (
+                            "search_related_nodes",
+                            query_typed_relation,
+                            find_sources,
+                            find_targets,
+                            *Neo4jVectorGraphStore._query_shape(
+                                required_labels, required_properties
+                            ),
                             include_missing_properties,
-                        )
-                    }\n"
-                    "RETURN n\n"
-                    f"{'LIMIT $limit' if limit is not None else ''}",
+                            limit is not None,
+                        ),
+                        lambda: (
+                            "MATCH\n"
+                            "    (m {uuid: $node_uuid})"
+                            f"    {'-' if find_targets else '<-'}"
+                            f"    {query_typed_relation}"
+                            f"    {'-' if find_sources else '->'}"
+                            f"    (n{
+                                Neo4jVectorGraphStore._format_labels(required_labels)
+                            })"
+                            f"WHERE {
+                                Neo4jVectorGraphStore._format_required_properties(
+                                    'n',
+                                    required_properties,
+                                    include_missing_properties,
+                                )
+                            }\n"
+                            "RETURN n\n"
+                            f"{'LIMIT $limit' if limit is not None else ''}"
+                        ),
+                    ),
                     node_uuid=str(node_uuid),
                     limit=limit,
                     required_properties={
@@ -488,6 +552,16 @@ class Neo4jVectorGraphStore(VectorGraphStore):
             case _:
                 similarity_function = "cosine"
 
+        # Quantization requires Neo4j 5.23+,
+        # so only set it when explicitly configured.
+        quantization_index_config = (
+            ",\n"
+            "        `vector.quantization.enabled`:\n"
+            "            $quantization_enabled"
+            if self._vector_index_quantization_enabled is not None
+            else ""
+        )
+
         create_index_tasks = [
             async_with(
                 self._semaphore,
@@ -501,11 +575,13 @@ class Neo4jVectorGraphStore(VectorGraphStore):
                     "        `vector.dimensions`:\n"
                     "            $dimensions,\n"
                     "        `vector.similarity_function`:\n"
-                    "            $similarity_function\n"
+                    "            $similarity_function"
+                    f"{quantization_index_config}\n"
                     "    }\n"
                     "}",
                     dimensions=dimensions,
                     similarity_function=similarity_function,
+                    quantization_enabled=self._vector_index_quantization_enabled,
                 ),
             )
             for sanitized_label, sanitized_embedding_property_name, vector_index_name in info_for_vector_indexes_to_create
@@ -533,7 +609,52 @@ class Neo4jVectorGraphStore(VectorGraphStore):
         async with self._semaphore:
             await self._driver.execute_query("CALL db.awaitIndexes()")
 
+    def _get_query(self, query_key: tuple, build_query: Callable[[], str]) -> str:
+        """
+        Get the Cypher query for a query shape,
+        building and caching it on first use.
+
+        Args:
+            query_key (tuple):
+                Hashable key identifying the shape of the query.
+            build_query (Callable[[], str]):
+                Function that builds the query text.
+
+        Returns:
+            str: The Cypher query.
+        """
+        query = self._query_cache.get(query_key)
+        if query is None:
+            query = build_query()
+            self._query_cache[query_key] = query
+        return query
+
+    @staticmethod
+    def _query_shape(
+        labels: Collection[str] | None,
+        required_properties: Mapping[str, Property],
+    ) -> tuple[frozenset[str] | None, frozenset[str]]:
+        """
+        Get the parts of a query key that are determined
+        by the labels and the names of the required properties.
+
+        Args:
+            labels (Collection[str] | None):
+                Collection of labels, or None.
+            required_properties (Mapping[str, Property]):
+                Mapping of required property names to values.
+
+        Returns:
+            tuple[frozenset[str] | None, frozenset[str]]:
+                The labels and the required property names.
+        """
+        return (
+            frozenset(labels) if labels is not None else None,
+            frozenset(required_properties.keys()),
+        )
+
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _sanitize_name(name: str) -> str:
         """
         Sanitize a name to be used in Neo4j.
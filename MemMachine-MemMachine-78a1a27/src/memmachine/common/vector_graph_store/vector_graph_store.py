@@ -50,6 +50,7 @@ class VectorGraphStore(ABC):
         required_labels: Collection[str] | None = None,
         required_properties: Mapping[str, Property] = {},
         include_missing_properties: bool = False,
+        num_ann_candidates: int | None = None,
     ) -> list[Node]:
         """
         Search for nodes with embeddings similar to the query embedding.
@@ -77,6 +78,14 @@ class VectorGraphStore(ABC):
             include_missing_properties (bool, optional):
                 If True, nodes missing any of the required properties
                 will also be included in the results.
+            num_ann_candidates (int | None, optional):
+                Number of nearest neighbors to retrieve
+                from an approximate vector index
+                before filtering and limiting.
+                Larger values improve recall at the cost of latency.
+                If None, the limit is used.
+                Ignored for exact similarity search
+                (default: None).
 
         Returns:
             list[Node]:
@@ -50,14 +50,22 @@ class VectorGraphStoreBuilder(Builder):
                     force_exact_similarity_search: bool = Field(
                         False, description="Whether to force exact similarity search"
                     )
+                    vector_index_quantization_enabled: bool | None = Field(
+                        None,
+                        description="Whether to enable int8 quantization of vector indexes",
+                    )
 
                 factory_params = Neo4jFactoryParams(**config)
+                # Size the connection pool to the transaction limit
+                # so that transactions admitted by the store
+                # never wait on connection acquisition.
                 driver = AsyncGraphDatabase.driver(
                     factory_params.uri,
                     auth=(
                         factory_params.username,
                         factory_params.password.get_secret_value(),
                     ),
+                    max_connection_pool_size=factory_params.max_concurrent_transactions,
                 )
 
                 return Neo4jVectorGraphStore(
@@ -65,6 +73,7 @@ class VectorGraphStoreBuilder(Builder):
                         driver=driver,
                         max_concurrent_transactions=factory_params.max_concurrent_transactions,
                         force_exact_similarity_search=factory_params.force_exact_similarity_search,
+                        vector_index_quantization_enabled=factory_params.vector_index_quantization_enabled,
                     )
                 )
             case _:
@@ -15,7 +15,7 @@ class ContentType(Enum):
     # Other content types like 'vector', 'image' could be added here.
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionInfo:
     """
     Represents the information about a single conversation session.
@@ -36,8 +36,23 @@ class SessionInfo:
     configuration: dict
     """A dictionary containing any custom configuration for this session."""
 
+    @classmethod
+    def from_row(cls, row: Any) -> "SessionInfo":
+        """
+        Build a SessionInfo from a database row
+        with group_id, session_id, agent_ids, user_ids,
+        and configuration columns.
+        """
+        return cls(
+            group_id=row.group_id,
+            session_id=row.session_id,
+            agent_ids=row.agent_ids,
+            user_ids=row.user_ids,
+            configuration=row.configuration,
+        )
 
-@dataclass
+
+@dataclass(slots=True)
 class GroupConfiguration:
     """
     Represents the configuration for a group of conversations.
@@ -52,6 +67,19 @@ class GroupConfiguration:
     configuration: dict
     """A dictionary containing any custom configuration for the group."""
 
+    @classmethod
+    def from_row(cls, row: Any) -> "GroupConfiguration":
+        """
+        Build a GroupConfiguration from a database row
+        with group_id, agent_list, user_list, and configuration columns.
+        """
+        return cls(
+            group_id=row.group_id,
+            agent_list=row.agent_list,
+            user_list=row.user_list,
+            configuration=row.configuration,
+        )
+
 
 @dataclass
 class MemoryContext:
@@ -82,7 +110,7 @@ class MemoryContext:
         )
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Episode:
     """
     Represents a single, atomic event or piece of data in the memory system.
@@ -1,9 +1,12 @@
+import json
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any
 from uuid import UUID
 
+import orjson
+
 FilterablePropertyValue = bool | int | str
 JSONValue = None | bool | int | float | str | list["JSONValue"] | dict[str, "JSONValue"]
 
@@ -12,7 +15,7 @@ class ContentType(Enum):
     STRING = "string"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Episode:
     uuid: UUID
     episode_type: str
@@ -25,7 +28,7 @@ class Episode:
     user_metadata: JSONValue = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class EpisodeCluster:
     uuid: UUID
     episodes: list[Episode] = field(default_factory=list)
@@ -36,7 +39,7 @@ class EpisodeCluster:
     user_metadata: JSONValue = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Derivative:
     uuid: UUID
     derivative_type: str
@@ -59,3 +62,26 @@ def demangle_filterable_property_key(mangled_key: str) -> str:
 
 def is_mangled_filterable_property_key(candidate_key: str) -> bool:
     return candidate_key.startswith("filterable_")
+
+
+def dump_user_metadata(user_metadata: JSONValue) -> str:
+    """
+    Serialize user metadata for storage as a JSON string.
+
+    Non-string dict keys are converted to strings, as with json.dumps.
+    NaN and infinite floats are not valid JSON and are stored as null.
+    """
+    return orjson.dumps(user_metadata, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def load_user_metadata(serialized_user_metadata: str) -> JSONValue:
+    """
+    Deserialize user metadata stored by dump_user_metadata.
+
+    Falls back to json.loads for metadata written by older versions
+    with json.dumps, which may contain NaN or Infinity.
+    """
+    try:
+        return orjson.loads(serialized_user_metadata)
+    except orjson.JSONDecodeError:
+        return json.loads(serialized_user_metadata)
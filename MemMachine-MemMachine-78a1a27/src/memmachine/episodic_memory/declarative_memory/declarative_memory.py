@@ -5,9 +5,8 @@ episodic and semantic memory.
 
 import asyncio
 import functools
-import json
 import logging
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Mapping
 from datetime import datetime
 from string import Template
 from typing import Any, Self, cast
@@ -25,7 +24,9 @@ from .data_types import (
     EpisodeCluster,
     FilterablePropertyValue,
     demangle_filterable_property_key,
+    dump_user_metadata,
     is_mangled_filterable_property_key,
+    load_user_metadata,
     mangle_filterable_property_key,
 )
 from .derivative_deriver import DerivativeDeriver
@@ -303,7 +304,7 @@ class DeclarativeMemory:
                         self._embedder.dimensions,
                     ): derivative_embedding,
                     "timestamp": derivative.timestamp,
-                    "user_metadata": json.dumps(derivative.user_metadata),
+                    "user_metadata": dump_user_metadata(derivative.user_metadata),
                 }
                 | {
                     mangle_filterable_property_key(key): value
@@ -353,7 +354,7 @@ class DeclarativeMemory:
             properties=dict(
                 {
                     "timestamp": episode_cluster.timestamp,
-                    "user_metadata": json.dumps(episode_cluster.user_metadata),
+                    "user_metadata": dump_user_metadata(episode_cluster.user_metadata),
                 }
                 | {
                     mangle_filterable_property_key(key): value
@@ -419,7 +420,7 @@ class DeclarativeMemory:
                 "content_type": episode.content_type.value,
                 "content": episode.content,
                 "timestamp": episode.timestamp,
-                "user_metadata": json.dumps(episode.user_metadata),
+                "user_metadata": dump_user_metadata(episode.user_metadata),
             }
             | {
                 mangle_filterable_property_key(key): value
@@ -487,7 +488,9 @@ class DeclarativeMemory:
         self,
         query: str,
         num_episodes_limit: int = 20,
-        property_filter: dict[str, FilterablePropertyValue] = {},
+        property_filter: Mapping[str, FilterablePropertyValue] = {},
+        num_candidates_limit: int = 100,
+        num_ann_candidates: int | None = None,
     ) -> list[Episode]:
         """
         Search declarative memory for episodes relevant to the query.
@@ -499,11 +502,21 @@ class DeclarativeMemory:
                 The maximum number
                 of episodes to return (default: 20).
             property_filter (
-                dict[str, FilterablePropertyValue], optional
+                Mapping[str, FilterablePropertyValue], optional
             ):
                 Filterable property keys and values to use
                 for filtering episodes.
                 If not provided, no filtering is applied.
+            num_candidates_limit (int, optional):
+                The maximum number of candidate derivatives
+                to retrieve per query derivative
+                before reranking (default: 100).
+            num_ann_candidates (int | None, optional):
+                The number of nearest neighbors
+                to explore in the vector index
+                per query derivative.
+                If None, num_candidates_limit is used
+                (default: None).
 
         Returns:
             list[Episode]:
@@ -548,12 +561,14 @@ class DeclarativeMemory:
                     )
                 ),
                 similarity_metric=self._embedder.similarity_metric,
+                limit=num_candidates_limit,
                 required_labels={"Derivative"},
                 required_properties={
                     mangle_filterable_property_key(key): value
                     for key, value in property_filter.items()
                 },
                 include_missing_properties=True,
+                num_ann_candidates=num_ann_candidates,
             )
             for derivative_embedding in derivative_embeddings
         ]
@@ -677,7 +692,7 @@ class DeclarativeMemory:
         self,
         nucleus_episode_node: Node,
         retrieval_depth_limit: int = 1,
-        property_filter: dict[str, FilterablePropertyValue] = {},
+        property_filter: Mapping[str, FilterablePropertyValue] = {},
     ) -> set[Node]:
         """
         Expand the context of a nucleus episode node
@@ -742,15 +757,12 @@ class DeclarativeMemory:
                     "user_metadata": episode.user_metadata,
                 },
                 **{
-                    key: value
-                    for key, value in {
-                        **episode.filterable_properties,
-                        **(
-                            episode.user_metadata
-                            if isinstance(episode.user_metadata, dict)
-                            else {}
-                        ),
-                    }.items()
+                    **episode.filterable_properties,
+                    **(
+                        episode.user_metadata
+                        if isinstance(episode.user_metadata, dict)
+                        else {}
+                    ),
                 },
             )
 
@@ -830,7 +842,7 @@ class DeclarativeMemory:
 
     async def forget_filtered_episodes(
         self,
-        property_filter: dict[str, FilterablePropertyValue] = {},
+        property_filter: Mapping[str, FilterablePropertyValue] = {},
     ):
         """
         Forget all episodes matching the given filterable properties
@@ -931,7 +943,9 @@ class DeclarativeMemory:
                     for key, value in node.properties.items()
                     if is_mangled_filterable_property_key(key)
                 },
-                user_metadata=json.loads(cast(str, node.properties["user_metadata"])),
+                user_metadata=load_user_metadata(
+                    cast(str, node.properties["user_metadata"])
+                ),
             )
             for node in episode_nodes
         ]
@@ -69,15 +69,12 @@ class MetadataDerivativeMutator(DerivativeMutator):
                 "user_metadata": derivative.user_metadata,
             },
             **{
-                key: value
-                for key, value in {
-                    **derivative.filterable_properties,
-                    **(
-                        derivative.user_metadata
-                        if isinstance(derivative.user_metadata, dict)
-                        else {}
-                    ),
-                }.items()
+                **derivative.filterable_properties,
+                **(
+                    derivative.user_metadata
+                    if isinstance(derivative.user_metadata, dict)
+                    else {}
+                ),
             },
         )
 
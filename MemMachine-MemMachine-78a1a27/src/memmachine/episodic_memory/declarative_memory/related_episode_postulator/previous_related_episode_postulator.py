@@ -6,7 +6,6 @@ This is suitable for use cases
 where recent episodes are likely to be relevant to the current episode.
 """
 
-import json
 from datetime import datetime
 from typing import cast
 
@@ -20,6 +19,7 @@ from ..data_types import (
     FilterablePropertyValue,
     demangle_filterable_property_key,
     is_mangled_filterable_property_key,
+    load_user_metadata,
     mangle_filterable_property_key,
 )
 from .related_episode_postulator import RelatedEpisodePostulator
@@ -113,7 +113,7 @@ class PreviousRelatedEpisodePostulator(RelatedEpisodePostulator):
                     for key, value in previous_episode_node.properties.items()
                     if is_mangled_filterable_property_key(key)
                 },
-                user_metadata=json.loads(
+                user_metadata=load_user_metadata(
                     cast(
                         str,
                         previous_episode_node.properties["user_metadata"],
@@ -1,4 +1,5 @@
-from typing import Any, cast
+from dataclasses import dataclass
+from typing import Any, Self, cast
 
 from memmachine.common.resource_initializer import ResourceInitializer
 
@@ -9,14 +10,124 @@ from ..declarative_memory.data_types import (
 from ..declarative_memory.data_types import Episode as DeclarativeMemoryEpisode
 from ..declarative_memory.declarative_memory_builder import DeclarativeMemoryBuilder
 
+# Content types share values across memory layers,
+# so build the translation maps once from the enum members.
 content_type_to_declarative_memory_content_type_map = {
-    ContentType.STRING: DeclarativeMemoryContentType.STRING,
+    content_type: DeclarativeMemoryContentType(content_type.value)
+    for content_type in ContentType
 }
 
 declarative_memory_content_type_to_content_type_map = {
-    DeclarativeMemoryContentType.STRING: ContentType.STRING,
+    declarative_memory_content_type: ContentType(declarative_memory_content_type.value)
+    for declarative_memory_content_type in DeclarativeMemoryContentType
 }
 
+# Approximate nearest neighbor search profiles,
+# mapping profile names to the number of candidates to rerank
+# and the number of nearest neighbors to explore in the vector index.
+ann_profiles: dict[str, tuple[int, int]] = {
+    "fast": (50, 50),
+    "balanced": (100, 100),
+    "recall_max": (200, 1000),
+}
+
+# Resource definitions that do not depend on the configuration.
+# Builders only read these, so they are shared across instances.
+static_resource_definitions: dict[str, Any] = {
+    "_query_derivative_deriver": {
+        "type": "derivative_deriver",
+        "name": "identity",
+        "config": {},
+    },
+    "_null_related_episode_postulator": {
+        "type": "related_episode_postulator",
+        "name": "null",
+        "config": {},
+    },
+    "metrics_factory": {
+        "type": "metrics_factory",
+        "name": "prometheus",
+        "config": {},
+    },
+}
+
+derivation_workflow_definition: dict[str, Any] = {
+    "related_episode_postulator_id": "_null_related_episode_postulator",
+    "derivative_derivation_workflows": [
+        {
+            "derivative_deriver_id": "_episode_derivative_deriver",
+            "derivative_mutation_workflows": [
+                {
+                    "derivative_mutator_id": "_metadata_derivative_mutator",
+                },
+            ],
+        },
+    ],
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Neo4jConfig:
+    """
+    Validated Neo4j connection settings for the vector graph store.
+    """
+
+    uri: str
+    username: str
+    password: str
+    max_concurrent_transactions: int = 100
+    force_exact_similarity_search: bool = False
+    vector_index_quantization_enabled: bool | None = None
+
+    @classmethod
+    def from_config(cls, vector_graph_store_config: dict[str, Any]) -> Self:
+        """
+        Validate a Neo4j storage config
+        and resolve its connection URI.
+        """
+        host = vector_graph_store_config.get("host")
+        if not isinstance(host, str):
+            raise TypeError("Neo4j host must be provided as a string")
+
+        if "neo4j+s://" in host:
+            uri = host
+        else:
+            port = vector_graph_store_config.get("port")
+            if not isinstance(port, int):
+                raise TypeError("Neo4j port must be provided as an integer")
+
+            uri = f"bolt://{host}:{port}"
+
+        username = vector_graph_store_config.get("user")
+        if not isinstance(username, str):
+            raise TypeError("Neo4j username must be provided as a string")
+
+        password = vector_graph_store_config.get("password")
+        if not isinstance(password, str):
+            raise TypeError("Neo4j password must be provided as a string")
+
+        max_concurrent_transactions = vector_graph_store_config.get(
+            "max_concurrent_transactions", 100
+        )
+        if (
+            not isinstance(max_concurrent_transactions, int)
+            or max_concurrent_transactions <= 0
+        ):
+            raise ValueError("Neo4j max concurrent transactions must be positive")
+
+        return cls(
+            uri=uri,
+            username=username,
+            password=password,
+            max_concurrent_transactions=max_concurrent_transactions,
+            force_exact_similarity_search=vector_graph_store_config.get(
+                "force_exact_similarity_search", False
+            ),
+            vector_index_quantization_enabled=vector_graph_store_config.get(
+                "vector_index_quantization_enabled"
+            ),
+        )
+
 
 class LongTermMemory:
     _shared_resources: dict[str, Any] = {}
@@ -40,30 +151,7 @@ class LongTermMemory:
         if vector_graph_store_config.get("vendor_name") != "neo4j":
             raise ValueError("Only Neo4j vector graph store is supported")
 
-        neo4j_host = vector_graph_store_config.get("host")
-        if not isinstance(neo4j_host, str):
-            raise TypeError("Neo4j host must be provided as a string")
-
-        if "neo4j+s://" in neo4j_host:
-            neo4j_uri = neo4j_host
-        else:
-            neo4j_port = vector_graph_store_config.get("port")
-            if not isinstance(neo4j_port, int):
-                raise TypeError("Neo4j port must be provided as an integer")
-
-            neo4j_uri = f"bolt://{neo4j_host}:{neo4j_port}"
-
-        neo4j_username = vector_graph_store_config.get("user")
-        if not isinstance(neo4j_username, str):
-            raise TypeError("Neo4j username must be provided as a string")
-
-        neo4j_password = vector_graph_store_config.get("password")
-        if not isinstance(neo4j_password, str):
-            raise TypeError("Neo4j password must be provided as a string")
-
-        neo4j_force_exact_similarity_search = vector_graph_store_config.get(
-            "force_exact_similarity_search", False
-        )
+        neo4j_config = Neo4jConfig.from_config(vector_graph_store_config)
 
         # Configure derivative deriver
         derivative_deriver_name = long_term_memory_config.get(
@@ -86,6 +174,22 @@ class LongTermMemory:
         if not isinstance(reranker_configs, dict):
             raise TypeError("Reranker configs must be a dictionary")
 
+        # Configure approximate nearest neighbor search
+        ann_profile = long_term_memory_config.get("ann_profile", "balanced")
+        if ann_profile not in ann_profiles:
+            raise ValueError(
+                f"ANN profile must be one of {', '.join(ann_profiles.keys())}"
+            )
+
+        rerank_candidates = long_term_memory_config.get("rerank_candidates")
+        if rerank_candidates is not None and (
+            not isinstance(rerank_candidates, int) or rerank_candidates <= 0
+        ):
+            raise ValueError("Rerank candidates must be a positive integer")
+
+        self._ann_profile = ann_profile
+        self._rerank_candidates = rerank_candidates
+
         embedder_resource_definitions = (
             {
                 embedder_id: {
@@ -120,11 +224,17 @@ class LongTermMemory:
                     "type": "vector_graph_store",
                     "name": "neo4j",
                     "config": {
-                        "uri": neo4j_uri,
-                        "username": neo4j_username,
-                        "password": neo4j_password,
+                        "uri": neo4j_config.uri,
+                        "username": neo4j_config.username,
+                        "password": neo4j_config.password,
+                        "max_concurrent_transactions": (
+                            neo4j_config.max_concurrent_transactions
+                        ),
                         "force_exact_similarity_search": (
-                            neo4j_force_exact_similarity_search
+                            neo4j_config.force_exact_similarity_search
+                        ),
+                        "vector_index_quantization_enabled": (
+                            neo4j_config.vector_index_quantization_enabled
                         ),
                     },
                 }
@@ -133,20 +243,6 @@ class LongTermMemory:
             else {}
         )
 
-        derivation_workflow_definition = {
-            "related_episode_postulator_id": ("_null_related_episode_postulator"),
-            "derivative_derivation_workflows": [
-                {
-                    "derivative_deriver_id": ("_episode_derivative_deriver"),
-                    "derivative_mutation_workflows": [
-                        {
-                            "derivative_mutator_id": ("_metadata_derivative_mutator"),
-                        },
-                    ],
-                },
-            ],
-        }
-
         resource_definitions = {
             "_previous_related_episode_postulator": {
                 "type": "related_episode_postulator",
@@ -159,11 +255,6 @@ class LongTermMemory:
                     ],
                 },
             },
-            "_query_derivative_deriver": {
-                "type": "derivative_deriver",
-                "name": "identity",
-                "config": {},
-            },
             "_metadata_derivative_mutator": {
                 "type": "derivative_mutator",
                 "name": "metadata",
@@ -176,27 +267,17 @@ class LongTermMemory:
                 "name": derivative_deriver_name,
                 "config": {},
             },
-            "_null_related_episode_postulator": {
-                "type": "related_episode_postulator",
-                "name": "null",
-                "config": {},
-            },
-            "metrics_factory": {
-                "type": "metrics_factory",
-                "name": "prometheus",
-                "config": {},
-            },
+            **static_resource_definitions,
         }
+        resource_definitions.update(embedder_resource_definitions)
+        resource_definitions.update(reranker_resource_definitions)
+        resource_definitions.update(vector_graph_store_resource_definitions)
 
-        resources = ResourceInitializer.initialize(
-            resource_definitions
-            | embedder_resource_definitions
-            | reranker_resource_definitions
-            | vector_graph_store_resource_definitions,
+        combined_resources = ResourceInitializer.initialize(
+            resource_definitions,
             LongTermMemory._shared_resources,
         )
-
-        combined_resources = resources | LongTermMemory._shared_resources
+        combined_resources.update(LongTermMemory._shared_resources)
 
         self._declarative_memory = DeclarativeMemoryBuilder.build(
             name="default",
@@ -240,12 +321,12 @@ class LongTermMemory:
             timestamp=episode.timestamp,
             filterable_properties={
                 key: value
-                for key, value in {
-                    "group_id": episode.group_id,
-                    "session_id": episode.session_id,
-                    "producer_id": episode.producer_id,
-                    "produced_for_id": episode.produced_for_id,
-                }.items()
+                for key, value in (
+                    ("group_id", episode.group_id),
+                    ("session_id", episode.session_id),
+                    ("producer_id", episode.producer_id),
+                    ("produced_for_id", episode.produced_for_id),
+                )
                 if value is not None
             },
             user_metadata=episode.user_metadata,
@@ -257,11 +338,27 @@ class LongTermMemory:
         query: str,
         num_episodes_limit: int,
         id_filter: dict[str, str] = {},
+        rerank_candidates: int | None = None,
+        ann_profile: str | None = None,
     ):
+        if ann_profile is None:
+            ann_profile = self._ann_profile
+        elif ann_profile not in ann_profiles:
+            raise ValueError(
+                f"ANN profile must be one of {', '.join(ann_profiles.keys())}"
+            )
+
+        profile_rerank_candidates, num_ann_candidates = ann_profiles[ann_profile]
+
+        if rerank_candidates is None:
+            rerank_candidates = self._rerank_candidates or profile_rerank_candidates
+
         declarative_memory_episodes = await self._declarative_memory.search(
             query,
             num_episodes_limit=num_episodes_limit,
-            property_filter=dict(id_filter),
+            property_filter=id_filter,
+            num_candidates_limit=max(num_episodes_limit, rerank_candidates),
+            num_ann_candidates=num_ann_candidates,
         )
         return [
             Episode(
@@ -0,0 +1,88 @@
+"""
+Migration of session database columns
+from JSON-encoded strings to native JSON columns.
+
+Older versions of SessionManager stored the agent and user lists
+and the configurations as JSON-encoded strings.
+On PostgreSQL, these columns are converted to JSONB in place.
+On SQLite, JSON columns are stored as text,
+so existing rows are already in the expected format
+and no migration is needed.
+
+SessionManager runs the migration on startup.
+Columns that are already JSONB are left unchanged,
+so it only alters the database once.
+It can also be run by hand:
+
+Usage:
+    python -m memmachine.episodic_memory.session_manager.migrate_json_columns \\
+        <uri> [--schema <schema>]
+"""
+
+import argparse
+
+from sqlalchemy import Engine, create_engine, inspect, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+json_columns = {
+    "sessions": ("agent_ids", "user_ids", "configuration"),
+    "group_info": ("agent_list", "user_list", "configuration"),
+}
+
+
+def migrate_json_columns(engine: Engine, schema: str = ""):
+    """
+    Convert the JSON-encoded string columns of the session database
+    to JSONB columns, skipping columns that are already JSONB.
+
+    Args:
+        engine (Engine):
+            Engine of the session database.
+        schema (str, optional):
+            Schema containing the session tables
+            (default: "").
+    """
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table_name, column_names in json_columns.items():
+            column_types = {
+                column["name"]: column["type"]
+                for column in inspector.get_columns(table_name, schema=schema or None)
+            }
+            qualified_table_name = (
+                f'"{schema}"."{table_name}"' if schema else f'"{table_name}"'
+            )
+            for column_name in column_names:
+                if isinstance(column_types.get(column_name), JSONB):
+                    continue
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {qualified_table_name}"
+                        f' ALTER COLUMN "{column_name}" TYPE JSONB'
+                        f' USING "{column_name}"::jsonb'
+                    )
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert session database columns to native JSON columns."
+    )
+    parser.add_argument("uri", help="Database connection URI")
+    parser.add_argument(
+        "--schema", default="", help="Schema containing the session tables"
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.uri)
+    try:
+        migrate_json_columns(engine, args.schema)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,44 @@
 """Manages database sessions for multi-agent and multi-user conversations."""
 
-import json
-import os
-from typing import Annotated
+import time
+from collections.abc import Iterator
+from typing import Annotated, Any, cast
 
+import orjson
 from sqlalchemy import (
+    JSON,
     ForeignKeyConstraint,
+    Index,
     Integer,
     PrimaryKeyConstraint,
     String,
     create_engine,
+    delete,
+    exists,
+    func,
+    insert,
+    lambda_stmt,
+    select,
 )
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import CursorResult, make_url
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import (
     DeclarativeBase,
+    InstrumentedAttribute,
     Mapped,
+    Session,
     mapped_column,
     relationship,
     sessionmaker,
 )
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
 from ..data_types import GroupConfiguration, SessionInfo
+from .migrate_json_columns import migrate_json_columns
 
 
 # Base class for declarative class definitions
@@ -32,6 +51,11 @@ class Base(DeclarativeBase):  # pylint: disable=too-few-public-methods
 IntColumn = Annotated[int, mapped_column(Integer)]
 StringKeyColumn = Annotated[str, mapped_column(String, primary_key=True)]
 StringColumn = Annotated[str, mapped_column(String)]
+# Stored as JSONB on PostgreSQL and as JSON text elsewhere,
+# so the driver handles encoding and decoding.
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+StringListColumn = Annotated[list[str], mapped_column(JSONType)]
+JSONObjectColumn = Annotated[dict[str, Any], mapped_column(JSONType)]
 
 
 class SessionManager:
@@ -47,10 +71,10 @@ class SessionManager:
 
         __tablename__ = "sessions"
         group_id: Mapped[StringKeyColumn]
-        agent_ids: Mapped[StringColumn]
-        user_ids: Mapped[StringColumn]
+        agent_ids: Mapped[StringListColumn]
+        user_ids: Mapped[StringListColumn]
         session_id: Mapped[StringKeyColumn]
-        configuration: Mapped[StringColumn]
+        configuration: Mapped[JSONObjectColumn]
         timestamp: Mapped[IntColumn]
         users = relationship(
             "User", back_populates="parent", cascade="all, delete-orphan"
@@ -77,6 +101,9 @@ class SessionManager:
                 ["group_id", "session_id"],
                 ["sessions.group_id", "sessions.session_id"],
             ),
+            # The primary key covers lookups by user_id,
+            # but not joins and cascades from sessions.
+            Index("ix_users_group_id_session_id", "group_id", "session_id"),
         )
         parent = relationship("MemSession")
 
@@ -97,6 +124,9 @@ class SessionManager:
                 ["group_id", "session_id"],
                 ["sessions.group_id", "sessions.session_id"],
             ),
+            # The primary key covers lookups by agent_id,
+            # but not joins and cascades from sessions.
+            Index("ix_agents_group_id_session_id", "group_id", "session_id"),
         )
         parent = relationship("MemSession")
 
@@ -105,9 +135,12 @@ class SessionManager:
 
         __tablename__ = "group_info"
         group_id: Mapped[StringKeyColumn]
-        user_list: Mapped[StringColumn]
-        agent_list: Mapped[StringColumn]
-        configuration: Mapped[StringColumn]
+        user_list: Mapped[StringListColumn]
+        agent_list: Mapped[StringListColumn]
+        configuration: Mapped[JSONObjectColumn]
+
+    # Number of rows fetched per batch when iterating over sessions.
+    _yield_per = 500
 
     def __init__(self, config: dict):
         """
@@ -115,7 +148,9 @@ class SessionManager:
 
         Args:
             config (dict): A configuration dictionary containing the database
-                           connection URI.
+                           connection URI and optional connection pool
+                           settings (pool_size, max_overflow, pool_timeout,
+                           pool_recycle).
                            Example: {"uri": "sqlite:///sessions.db"}
 
         Raises:
@@ -127,18 +162,42 @@ class SessionManager:
         sql_path = config.get("uri")
         if sql_path is None or len(sql_path) < 1:
             raise ValueError(f"""Invalid sql path: {str(config)}""")
-        if "postgresql" not in sql_path and sql_path.find(":///") < 0:
-            sql_path = "sqlite:///" + sql_path
-
-        # create empty sqlite file if it does not exist
-        if sql_path.startswith("sqlite:///"):
-            file_path = sql_path.replace("sqlite:///", "")
-            if os.path.exists(file_path):
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write("")
-
-        self._engine = create_engine(sql_path)
-        self._session = sessionmaker(bind=self._engine)
+        # A bare file path is treated as a SQLite database.
+        url = make_url(sql_path if "://" in sql_path else "sqlite:///" + sql_path)
+
+        # Validate connections on checkout and recycle them periodically
+        # so that connections dropped by the server are not handed out.
+        engine_kwargs: dict[str, Any] = {
+            "pool_pre_ping": True,
+            "pool_recycle": config.get("pool_recycle", 1800),
+        }
+        if url.get_backend_name() == "sqlite":
+            # Sessions are used from multiple threads.
+            engine_kwargs["connect_args"] = {"check_same_thread": False}
+            if url.database in (None, "", ":memory:"):
+                # An in-memory database only lives as long as its connection,
+                # so all threads must share a single connection.
+                engine_kwargs["poolclass"] = StaticPool
+        if engine_kwargs.get("poolclass") is None:
+            engine_kwargs |= {
+                "pool_size": config.get("pool_size", 10),
+                "max_overflow": config.get("max_overflow", 20),
+                "pool_timeout": config.get("pool_timeout", 30),
+            }
+
+        self._engine = create_engine(
+            url,
+            query_cache_size=1200,
+            # Encode and decode JSON columns with orjson.
+            json_serializer=lambda value: orjson.dumps(value).decode(),
+            json_deserializer=orjson.loads,
+            **engine_kwargs,
+        )
+        # Writes use self._session.begin(),
+        # which commits on success and rolls back on error.
+        # Objects stay loaded after the commit
+        # instead of being reloaded on the next access.
+        self._session = sessionmaker(bind=self._engine, expire_on_commit=False)
 
         schema = config.get("schema", "")
         if schema:
@@ -147,6 +206,13 @@ class SessionManager:
 
         # Create all tables defined in the Base metadata if they don't exist
         Base.metadata.create_all(self._engine)
+        # Convert the JSON columns of databases created by older versions.
+        migrate_json_columns(self._engine, schema)
+        # create_all does not alter existing tables,
+        # so add indexes missing from databases created by older versions.
+        for table in Base.metadata.tables.values():
+            for index in table.indexes:
+                index.create(self._engine, checkfirst=True)
 
     def __del__(self):
         """Destructor to clean up database engine resources."""
@@ -176,26 +242,23 @@ class SessionManager:
         """
         if len(agent_ids) == 0 and len(user_ids) == 0:
             raise ValueError("New group without users or agents")
-        with self._session() as dbsession:
+        with self._session.begin() as dbsession:
             # Query for an existing group with the same ID
-            group = (
-                dbsession.query(self.GroupInfo)
-                .filter(self.GroupInfo.group_id == group_id)
-                .first()
-            )
-            if group is not None:
+            existing_group = dbsession.execute(
+                SessionManager._select_group(group_id)
+            ).first()
+            if existing_group is not None:
                 raise ValueError(f"""Group {group_id} already exists""")
-            group = self.GroupInfo(
-                group_id=group_id,
-                user_list=json.dumps(user_ids),
-                agent_list=json.dumps(agent_ids),
-                configuration=json.dumps(
-                    configuration if configuration is not None else {}
-                ),
+            # Insert the row directly; the ORM object would only be
+            # tracked until the commit and never read back.
+            dbsession.execute(
+                insert(SessionManager.GroupInfo).values(
+                    group_id=group_id,
+                    user_list=user_ids,
+                    agent_list=agent_ids,
+                    configuration=configuration if configuration is not None else {},
+                )
             )
-            dbsession.add(group)
-            dbsession.commit()
-            dbsession.refresh(group)
 
     def retrieve_group(self, group_id: str) -> GroupConfiguration | None:
         """
@@ -209,19 +272,7 @@ class SessionManager:
                                         None otherwise.
         """
         with self._session() as dbsession:
-            group = (
-                dbsession.query(self.GroupInfo)
-                .filter(self.GroupInfo.group_id == group_id)
-                .first()
-            )
-            if group is None:
-                return None
-            return GroupConfiguration(
-                group_id=group.group_id,
-                agent_list=json.loads(group.agent_list),
-                user_list=json.loads(group.user_list),
-                configuration=json.loads(group.configuration),
-            )
+            return self._get_group(dbsession, group_id)
 
     def delete_group(self, group_id: str):
         """
@@ -230,19 +281,30 @@ class SessionManager:
         Args:
             group_id (str): The ID of the group.
         """
-        with self._session() as dbsession:
-            sessions = (
-                dbsession.query(self.MemSession)
-                .filter(self.MemSession.group_id == group_id)
-                .all()
-            )
-            if len(sessions) > 0:
-                raise ValueError(f"Group {group_id} has sessions {len(sessions)}")
+        with self._session.begin() as dbsession:
+            has_sessions = dbsession.execute(
+                lambda_stmt(
+                    lambda: select(
+                        exists().where(SessionManager.MemSession.group_id == group_id)
+                    )
+                )
+            ).scalar()
+            if has_sessions:
+                # Only count the sessions when reporting the error.
+                num_sessions = dbsession.execute(
+                    select(func.count())
+                    .select_from(SessionManager.MemSession)
+                    .where(SessionManager.MemSession.group_id == group_id)
+                ).scalar()
+                raise ValueError(f"Group {group_id} has sessions {num_sessions}")
             # Delete the group
-            dbsession.query(self.GroupInfo).filter(
-                self.GroupInfo.group_id == group_id
-            ).delete()
-            dbsession.commit()
+            dbsession.execute(
+                lambda_stmt(
+                    lambda: delete(SessionManager.GroupInfo).where(
+                        SessionManager.GroupInfo.group_id == group_id
+                    )
+                )
+            )
 
     def retrieve_all_groups(self) -> list[GroupConfiguration]:
         """
@@ -252,18 +314,8 @@ class SessionManager:
             list[GroupConfiguration]: A list of GroupConfiguration objects.
         """
         with self._session() as dbsession:
-            groups = dbsession.query(self.GroupInfo).all()
-            result = []
-            for group in groups:
-                result.append(
-                    GroupConfiguration(
-                        group_id=group.group_id,
-                        agent_list=json.loads(group.agent_list),
-                        user_list=json.loads(group.user_list),
-                        configuration=json.loads(group.configuration),
-                    )
-                )
-            return result
+            groups = dbsession.execute(select(*SessionManager._group_columns())).all()
+            return [GroupConfiguration.from_row(group) for group in groups]
 
     def open_session(self, group_id: str, session_id: str) -> SessionInfo:
         """
@@ -278,25 +330,14 @@ class SessionManager:
                          session.
         """
         with self._session() as dbsession:
-            sessions = (
-                dbsession.query(self.MemSession)
-                .filter(
-                    self.MemSession.session_id == session_id,
-                    self.MemSession.group_id == group_id,
-                )
-                .all()
-            )
-            if len(sessions) < 1:
+            session = dbsession.execute(
+                SessionManager._select_session(group_id, session_id)
+            ).one_or_none()
+            if session is None:
                 raise ValueError(
                     f"""Session {group_id}: {session_id} does not exists"""
                 )
-            return SessionInfo(
-                group_id=sessions[0].group_id,
-                agent_ids=json.loads(sessions[0].agent_ids),
-                user_ids=json.loads(sessions[0].user_ids),
-                session_id=sessions[0].session_id,
-                configuration=json.loads(sessions[0].configuration),
-            )
+            return SessionInfo.from_row(session)
 
     def create_session(
         self,
@@ -320,48 +361,24 @@ class SessionManager:
             SessionInfo: An object containing the information of the created
                          session.
         """
-        with self._session() as dbsession:
-            groups = (
-                dbsession.query(self.GroupInfo)
-                .filter(self.GroupInfo.group_id == group_id)
-                .all()
-            )
-            if len(groups) == 0:
+        with self._session.begin() as dbsession:
+            group = self._get_group(dbsession, group_id)
+            if group is None:
                 raise ValueError(f"""Group {group_id} does not exist""")
-            sessions = (
-                dbsession.query(self.MemSession)
-                .filter(
-                    self.MemSession.session_id == session_id,
-                    self.MemSession.group_id == group_id,
-                )
-                .all()
-            )
-            if len(sessions) > 0:
+            agent_ids = group.agent_list
+            user_ids = group.user_list
+            # Create the new session,
+            # failing if it already exists.
+            if not self._insert_session(
+                dbsession,
+                group_id,
+                session_id,
+                agent_ids,
+                user_ids,
+                configuration if configuration is not None else {},
+                if_not_exists=True,
+            ):
                 raise ValueError(f"""Session {group_id}: {session_id} already exists""")
-            config = json.dumps(configuration if configuration is not None else {})
-            agent_ids = json.loads(groups[0].agent_list)
-            user_ids = json.loads(groups[0].user_list)
-            # Create the new session
-            new_sess = self.MemSession(
-                timestamp=int(os.times()[4]),
-                group_id=group_id,
-                agent_ids=groups[0].agent_list,
-                user_ids=groups[0].user_list,
-                session_id=session_id,
-                configuration=config,
-                agents=[
-                    self.Agent(
-                        agent_id=agent_id, group_id=group_id, session_id=session_id
-                    )
-                    for agent_id in agent_ids
-                ],
-                users=[
-                    self.User(user_id=user_id, group_id=group_id, session_id=session_id)
-                    for user_id in user_ids
-                ],
-            )
-            dbsession.add(new_sess)
-            dbsession.commit()
 
             return SessionInfo(
                 group_id=group_id,
@@ -397,77 +414,46 @@ class SessionManager:
         Returns:
             SessionInfo: An object containing the information of the created
             or found session.
-
-        Raises:
-            ValueError: If more than one session is found with the given
-                        parameters.
         """
-        agents = json.dumps(agent_ids)
-        users = json.dumps(user_ids)
-        config = json.dumps(configuration if configuration is not None else {})
-        with self._session() as dbsession:
-            # Query for an existing session with the same group id
-            sess = (
-                dbsession.query(self.MemSession)
-                .filter(
-                    self.MemSession.group_id == group_id,
-                    self.MemSession.session_id == session_id,
-                )
-                .all()
-            )
-
-            if len(sess) > 1:
-                raise ValueError(f"""More than one session found with same ID
-                                  {group_id}: {session_id}""")
-
-            if len(sess) == 0:
-                # Check if group exists. If not, create one
-                group = (
-                    dbsession.query(self.GroupInfo)
-                    .filter(self.GroupInfo.group_id == group_id)
-                    .first()
-                )
-                if group is None:
-                    self.create_new_group(group_id, agent_ids, user_ids, configuration)
-                else:
-                    agents = group.agent_list
-                    users = group.user_list
-
-                # Create a new session if it doesn't exist
-                new_sess = self.MemSession(
-                    timestamp=int(os.times()[4]),
+        agents = agent_ids
+        users = user_ids
+        config = configuration if configuration is not None else {}
+        with self._session.begin() as dbsession:
+            # Check if group exists. If not, create one
+            group = self._get_group(dbsession, group_id)
+            if group is None:
+                self.create_new_group(group_id, agent_ids, user_ids, configuration)
+            else:
+                agents = group.agent_list
+                users = group.user_list
+
+            # Create the session unless it already exists,
+            # without a separate existence check that could race.
+            if self._insert_session(
+                dbsession,
+                group_id,
+                session_id,
+                agents,
+                users,
+                config,
+                if_not_exists=True,
+                link_agent_ids=agent_ids,
+                link_user_ids=user_ids,
+            ):
+                return SessionInfo(
                     group_id=group_id,
                     agent_ids=agents,
                     user_ids=users,
                     session_id=session_id,
                     configuration=config,
-                    agents=[
-                        self.Agent(
-                            agent_id=agent_id, group_id=group_id, session_id=session_id
-                        )
-                        for agent_id in agent_ids
-                    ],
-                    users=[
-                        self.User(
-                            user_id=user_id, group_id=group_id, session_id=session_id
-                        )
-                        for user_id in user_ids
-                    ],
                 )
-                dbsession.add(new_sess)
-                dbsession.commit()
-                sess_data = new_sess
-            else:
-                sess_data = sess[0]
+
+            sess_data = dbsession.execute(
+                SessionManager._select_session(group_id, session_id)
+            ).one()
 
             # Return session information as a SessionInfo object
-            return SessionInfo(
-                group_id=sess_data.group_id,
-                agent_ids=json.loads(sess_data.agent_ids),
-                user_ids=json.loads(sess_data.user_ids),
-                session_id=sess_data.session_id,
-                configuration=json.loads(sess_data.configuration),
-            )
+            return SessionInfo.from_row(sess_data)
 
     def get_all_sessions(self) -> list[SessionInfo]:
         """
@@ -477,21 +463,24 @@ class SessionManager:
             list[SessionInfo]: A list of objects containing session
                               information.
         """
+        return list(self.iter_all_sessions())
+
+    def iter_all_sessions(self) -> Iterator[SessionInfo]:
+        """
+        Iterates over all sessions in the database,
+        fetching them from the database in batches.
+
+        Yields:
+            SessionInfo: An object containing session information.
+        """
         with self._session() as dbsession:
-            sessions = dbsession.query(self.MemSession).all()
-            result = []
+            sessions = dbsession.execute(
+                select(*SessionManager._session_columns()),
+                execution_options={"yield_per": SessionManager._yield_per},
+            )
             for session in sessions:
-                # Convert each ORM object to a SessionInfo dataclass instance
-                result.append(
-                    SessionInfo(
-                        group_id=session.group_id,
-                        agent_ids=json.loads(session.agent_ids),
-                        user_ids=json.loads(session.user_ids),
-                        session_id=session.session_id,
-                        configuration=json.loads(session.configuration),
-                    )
-                )
-        return result
+                # Convert each row to a SessionInfo dataclass instance
+                yield SessionInfo.from_row(session)
 
     def get_session_by_user(self, usr_id: str) -> list[SessionInfo]:
         """
@@ -505,29 +494,28 @@ class SessionManager:
                                the given user.
         """
         with self._session() as dbsession:
-            # Find all session links for the given user ID.
-            # Note: This performs N+1 queries. For better performance, a JOIN
-            # would be preferable.
-            user_session_links = (
-                dbsession.query(self.User).filter(self.User.user_id == usr_id).all()
-            )
-            result = []
-            for link in user_session_links:
-                # For each link, fetch the full session details
-                sess = link.parent
-                if sess is None:
-                    continue
-
-                result.append(
-                    SessionInfo(
-                        group_id=sess.group_id,
-                        agent_ids=json.loads(sess.agent_ids),
-                        user_ids=json.loads(sess.user_ids),
-                        session_id=sess.session_id,
-                        configuration=json.loads(sess.configuration),
+            # Join the user links with their sessions
+            # to fetch all sessions in a single query.
+            user_sessions = dbsession.execute(
+                lambda_stmt(
+                    lambda: (
+                        select(*SessionManager._session_columns())
+                        .join(
+                            SessionManager.User,
+                            (
+                                SessionManager.User.group_id
+                                == SessionManager.MemSession.group_id
+                            )
+                            & (
+                                SessionManager.User.session_id
+                                == SessionManager.MemSession.session_id
+                            ),
+                        )
+                        .where(SessionManager.User.user_id == usr_id)
                     )
                 )
-        return result
+            ).all()
+            return [SessionInfo.from_row(sess) for sess in user_sessions]
 
     def get_session_by_group(self, group_id: str) -> list[SessionInfo]:
         """
@@ -540,27 +528,27 @@ class SessionManager:
             list[SessionInfo]: A list of session information objects for the
                                given group.
         """
+        return list(self.iter_session_by_group(group_id))
+
+    def iter_session_by_group(self, group_id: str) -> Iterator[SessionInfo]:
+        """
+        Iterates over all sessions associated with a specific group ID,
+        fetching them from the database in batches.
+
+        Args:
+            group_id (str): The ID of the group.
+
+        Yields:
+            SessionInfo: A session information object for the given group.
+        """
         with self._session() as dbsession:
-            # Find all session links for the given group ID.
-            # Note: This performs N+1 queries. For better performance, a JOIN
-            #       would be preferable.
-            group_sessions = (
-                dbsession.query(self.MemSession)
-                .filter(self.MemSession.group_id == group_id)
-                .all()
+            # Find all sessions for the given group ID.
+            group_sessions = dbsession.execute(
+                SessionManager._select_group_sessions(group_id),
+                execution_options={"yield_per": SessionManager._yield_per},
             )
-            result = []
             for sess in group_sessions:
-                result.append(
-                    SessionInfo(
-                        group_id=sess.group_id,
-                        agent_ids=json.loads(sess.agent_ids),
-                        user_ids=json.loads(sess.user_ids),
-                        session_id=sess.session_id,
-                        configuration=json.loads(sess.configuration),
-                    )
-                )
-            return result
+                yield SessionInfo.from_row(sess)
 
     def get_session_by_agent(self, agent_id: str) -> list[SessionInfo]:
         """
@@ -574,30 +562,28 @@ class SessionManager:
                               given agent.
         """
         with self._session() as dbsession:
-            # Find all session links for the given agent ID.
-            # Note: This performs N+1 queries. For better performance, a JOIN
-            # would be preferable.
-            agent_session_links = (
-                dbsession.query(self.Agent)
-                .filter(self.Agent.agent_id == agent_id)
-                .all()
-            )
-            result = []
-            for link in agent_session_links:
-                sess = link.parent
-                if sess is None:
-                    continue
-
-                result.append(
-                    SessionInfo(
-                        group_id=sess.group_id,
-                        agent_ids=json.loads(sess.agent_ids),
-                        user_ids=json.loads(sess.user_ids),
-                        session_id=sess.session_id,
-                        configuration=json.loads(sess.configuration),
+            # Join the agent links with their sessions
+            # to fetch all sessions in a single query.
+            agent_sessions = dbsession.execute(
+                lambda_stmt(
+                    lambda: (
+                        select(*SessionManager._session_columns())
+                        .join(
+                            SessionManager.Agent,
+                            (
+                                SessionManager.Agent.group_id
+                                == SessionManager.MemSession.group_id
+                            )
+                            & (
+                                SessionManager.Agent.session_id
+                                == SessionManager.MemSession.session_id
+                            ),
+                        )
+                        .where(SessionManager.Agent.agent_id == agent_id)
                     )
                 )
-        return result
+            ).all()
+            return [SessionInfo.from_row(sess) for sess in agent_sessions]
 
     def delete_session(
         self,
@@ -615,22 +601,197 @@ class SessionManager:
             user_ids (list[str]): A list of user IDs for the session to delete.
             session_id (str): The unique identifier for the session to delete.
         """
-        with self._session() as dbsession:
-            # Find the session to delete
-            sessions = (
-                dbsession.query(self.MemSession)
-                .filter(
-                    self.MemSession.session_id == session_id,
-                    self.MemSession.group_id == group_id,
+        with self._session.begin() as dbsession:
+            # Delete the links and then the session with bulk statements
+            # instead of loading them to cascade the deletion.
+            for link in (SessionManager.Agent, SessionManager.User):
+                dbsession.execute(
+                    lambda_stmt(
+                        lambda: delete(link).where(
+                            link.group_id == group_id,
+                            link.session_id == session_id,
+                        )
+                    )
+                )
+            dbsession.execute(
+                lambda_stmt(
+                    lambda: delete(SessionManager.MemSession).where(
+                        SessionManager.MemSession.group_id == group_id,
+                        SessionManager.MemSession.session_id == session_id,
+                    )
                 )
-                .all()
             )
-            if len(sessions) == 0:
-                return  # Session not found
 
-            session_to_delete = sessions[0]
+    def _insert_session(
+        self,
+        dbsession: Session,
+        group_id: str,
+        session_id: str,
+        agent_ids: list[str],
+        user_ids: list[str],
+        configuration: dict,
+        if_not_exists: bool = False,
+        link_agent_ids: list[str] | None = None,
+        link_user_ids: list[str] | None = None,
+    ) -> bool:
+        # pylint: disable=too-many-arguments
+        # pylint: disable=too-many-positional-arguments
+        """
+        Insert a session and its agent and user links,
+        inserting the links of each kind in a single statement.
+
+        If if_not_exists is True and the session already exists,
+        nothing is inserted.
+        The links default to agent_ids and user_ids
+        unless link_agent_ids or link_user_ids are given.
+
+        Returns:
+            bool: True if the session was inserted, False otherwise.
+        """
+        session_values = {
+            "timestamp": int(time.time()),
+            "group_id": group_id,
+            "agent_ids": agent_ids,
+            "user_ids": user_ids,
+            "session_id": session_id,
+            "configuration": configuration,
+        }
+        if not if_not_exists:
+            dbsession.execute(insert(self.MemSession).values(session_values))
+        elif self._engine.dialect.name in ("postgresql", "sqlite"):
+            dialect_insert = (
+                postgresql_insert
+                if self._engine.dialect.name == "postgresql"
+                else sqlite_insert
+            )
+            result = cast(
+                CursorResult,
+                dbsession.execute(
+                    dialect_insert(self.MemSession)
+                    .values(session_values)
+                    .on_conflict_do_nothing(index_elements=["group_id", "session_id"])
+                ),
+            )
+            if result.rowcount == 0:
+                return False
+        else:
+            try:
+                with dbsession.begin_nested():
+                    dbsession.execute(insert(self.MemSession).values(session_values))
+            except IntegrityError:
+                return False
+
+        agent_ids = link_agent_ids if link_agent_ids is not None else agent_ids
+        user_ids = link_user_ids if link_user_ids is not None else user_ids
+        if len(agent_ids) > 0:
+            dbsession.execute(
+                insert(self.Agent),
+                [
+                    {
+                        "agent_id": agent_id,
+                        "group_id": group_id,
+                        "session_id": session_id,
+                    }
+                    for agent_id in agent_ids
+                ],
+            )
+        if len(user_ids) > 0:
+            dbsession.execute(
+                insert(self.User),
+                [
+                    {
+                        "user_id": user_id,
+                        "group_id": group_id,
+                        "session_id": session_id,
+                    }
+                    for user_id in user_ids
+                ],
+            )
+        return True
+
+    def _get_group(
+        self, dbsession: Session, group_id: str
+    ) -> GroupConfiguration | None:
+        """
+        Get a group by its ID.
 
-            # Delete the main session entry
-            # cascade deletion will remove entries in child tables
-            dbsession.delete(session_to_delete)
-            dbsession.commit()
+        The group is read in the given database session,
+        so that it is consistent with the rest of its transaction.
+
+        Args:
+            dbsession (Session): The database session to query with.
+            group_id (str): The ID of the group.
+
+        Returns:
+            GroupConfiguration | None: A GroupConfiguration object if found,
+                                        None otherwise.
+        """
+        row = dbsession.execute(SessionManager._select_group(group_id)).first()
+        if row is None:
+            return None
+        return GroupConfiguration.from_row(row)
+
+    # Only the columns needed for GroupConfiguration and SessionInfo
+    # are selected, so rows are returned as plain tuples
+    # without constructing and tracking ORM objects.
+    @staticmethod
+    def _group_columns() -> tuple[InstrumentedAttribute, ...]:
+        """
+        Get the group columns needed to build a GroupConfiguration.
+        """
+        return (
+            SessionManager.GroupInfo.group_id,
+            SessionManager.GroupInfo.agent_list,
+            SessionManager.GroupInfo.user_list,
+            SessionManager.GroupInfo.configuration,
+        )
+
+    @staticmethod
+    def _session_columns() -> tuple[InstrumentedAttribute, ...]:
+        """
+        Get the session columns needed to build a SessionInfo.
+        """
+        return (
+            SessionManager.MemSession.group_id,
+            SessionManager.MemSession.session_id,
+            SessionManager.MemSession.agent_ids,
+            SessionManager.MemSession.user_ids,
+            SessionManager.MemSession.configuration,
+        )
+
+    # Statements are built with lambda_stmt so that SQLAlchemy caches
+    # the constructed statement and its compiled SQL per call site,
+    # binding only the ID values on each call.
+    @staticmethod
+    def _select_group(group_id: str) -> StatementLambdaElement:
+        """
+        Build a statement selecting the group with the given ID.
+        """
+        return lambda_stmt(
+            lambda: select(*SessionManager._group_columns()).where(
+                SessionManager.GroupInfo.group_id == group_id
+            )
+        )
+
+    @staticmethod
+    def _select_group_sessions(group_id: str) -> StatementLambdaElement:
+        """
+        Build a statement selecting all sessions in the given group.
+        """
+        return lambda_stmt(
+            lambda: select(*SessionManager._session_columns()).where(
+                SessionManager.MemSession.group_id == group_id
+            )
+        )
+
+    @staticmethod
+    def _select_session(group_id: str, session_id: str) -> StatementLambdaElement:
+        """
+        Build a statement selecting the session with the given IDs.
+        """
+        return lambda_stmt(
+            lambda: select(*SessionManager._session_columns()).where(
+                SessionManager.MemSession.group_id == group_id,
+                SessionManager.MemSession.session_id == session_id,
+            )
+        )
@@ -12,6 +12,8 @@ context over a longer conversation.
 import asyncio
 import logging
 from collections import deque
+from collections.abc import Iterable
+from itertools import islice
 
 from memmachine.common.data_types import ExternalServiceAPIError
 
@@ -31,6 +33,9 @@ class SessionMemory:
     evicted and summarized.
     """
 
+    # Seconds to wait for a pending summary during retrieval.
+    _summary_wait_timeout = 0.05
+
     def __init__(
         self,
         model,
@@ -71,7 +76,12 @@ class SessionMemory:
         self._max_token_num = max_token_num
         self._current_message_len = 0
         self._current_token_num = 0
+        # Token counts of the episodes in memory, keyed by episode id.
+        # Entries are removed when their episodes leave memory,
+        # so ids are never reused while cached.
+        self._token_cache: dict[int, int] = {}
         self._summary = ""
+        self._summary_token_num = 0
         self._memory_context = memory_context
         self._summary_task = None
         self._lock = asyncio.Lock()
@@ -105,38 +115,47 @@ class SessionMemory:
             otherwise.
         """
         async with self._lock:
+            if len(self._memory) == self._memory.maxlen:
+                # The deque drops its oldest episode on append.
+                self._token_cache.pop(id(self._memory[0]), None)
             self._memory.append(episode)
 
             self._current_episode_count += 1
-            self._current_message_len += len(episode.content)
-            self._current_token_num += self._compute_token_num(self._memory[-1])
-            full = self._is_full()
+            content_len = len(episode.content)
+            self._current_message_len += content_len
+            self._current_token_num += self._episode_tokens(episode, content_len)
+            # Same check as _is_full, inlined to avoid a method call
+            # for every added episode.
+            full = (
+                self._current_episode_count >= self._capacity
+                or self._current_message_len >= self._max_message_len
+                or self._current_token_num >= self._max_token_num
+            )
             if full:
-                await self._do_evict()
+                self._do_evict()
             return full
 
-    async def _do_evict(self):
+    def _do_evict(self):
         """
         The eviction make a copy of the episode to create summary
         asynchronously. It clears the stats. It keeps as many episode
         as possible for current capacity.
         """
-        result = []
         # do not clear the episode memory here so rolling episode can be
         #  used as context
         # just remove the episode that left over from previous evition.
-        while len(self._memory) > self._current_episode_count:
-            self._memory.popleft()
+        for _ in range(len(self._memory) - self._current_episode_count):
+            self._token_cache.pop(id(self._memory.popleft()), None)
 
-        for e in self._memory:
-            result.append(e)
+        result = list(self._memory)
         self._current_episode_count = 0
         self._current_message_len = 0
         self._current_token_num = 0
-        # if previous summary task is still running, wait for it
-        if self._summary_task is not None:
-            await self._summary_task
-        self._summary_task = asyncio.create_task(self._create_summary(result))
+        # The new summary task waits for the previous one itself,
+        # so eviction does not wait for a model call under the lock.
+        self._summary_task = asyncio.create_task(
+            self._create_summary(result, self._summary_task)
+        )
 
     async def clear_memory(self):
         """
@@ -146,18 +165,28 @@ class SessionMemory:
         """
         async with self._lock:
             if self._summary_task is not None:
+                # Wait for the cancelled task to finish
+                # so that it releases its episodes right away.
+                # asyncio.wait neither raises the task's exception
+                # nor swallows a cancellation of this coroutine.
                 self._summary_task.cancel()
+                await asyncio.wait([self._summary_task])
+                self._summary_task = None
             self._memory.clear()
+            self._token_cache.clear()
             self._current_episode_count = 0
             self._current_message_len = 0
             self._current_token_num = 0
             self._summary = ""
+            self._summary_token_num = 0
 
     async def close(self):
         """Closes the memory, which currently just involves clearing it."""
         await self.clear_memory()
 
-    async def _create_summary(self, episodes: list[Episode]):
+    async def _create_summary(
+        self, episodes: list[Episode], previous_task: asyncio.Task | None = None
+    ):
         """
         Generates a new summary of the events currently in memory.
 
@@ -165,21 +194,19 @@ class SessionMemory:
         exists, it creates a "rolling" summary that incorporates the previous
         summary and the new episodes. It uses the configured language model
         and prompts to generate the summary.
+
+        If a previous summary task is given, it waits for that task first
+        so that the rolling summary includes its result.
+        Cancelling this task also cancels the previous one.
         """
+        if previous_task is not None:
+            await asyncio.gather(previous_task, return_exceptions=True)
         try:
-            episode_content = ""
-            for entry in episodes:
-                meta = ""
-                if entry.user_metadata is None:
-                    pass
-                elif isinstance(entry.user_metadata, str):
-                    meta = entry.user_metadata
-                elif isinstance(entry.user_metadata, dict):
-                    for k, v in entry.user_metadata.items():
-                        meta += f"[{k}: {v}] "
-                else:
-                    meta = repr(entry.user_metadata)
-                episode_content += f"[{str(entry.uuid)} : {meta} : {entry.content}]"
+            meta_string = SessionMemory._meta_string
+            episode_content = "".join(
+                f"[{entry.uuid} : {meta_string(entry)} : {entry.content}]"
+                for entry in episodes
+            )
             msg = self._summary_user_prompt.format(
                 episodes=episode_content, summary=self._summary
             )
@@ -187,6 +214,7 @@ class SessionMemory:
                 system_prompt=self._summary_system_prompt, user_prompt=msg
             )
             self._summary = result[0]
+            self._summary_token_num = SessionMemory._compute_token_num(self._summary)
             logger.debug("Summary: %s\n", self._summary)
         except ExternalServiceAPIError:
             logger.info("External API error when creating summary")
@@ -195,6 +223,21 @@ class SessionMemory:
         except RuntimeError:
             logger.info("Runtime error when creating summary")
 
+    @staticmethod
+    def _meta_string(episode: Episode) -> str:
+        """
+        Formats the user metadata of an episode for a summary prompt.
+        Subclasses of str and dict are formatted with repr().
+        """
+        user_metadata = episode.user_metadata
+        if user_metadata is None:
+            return ""
+        if type(user_metadata) is str:
+            return user_metadata
+        if type(user_metadata) is dict:
+            return "".join(f"[{k}: {v}] " for k, v in user_metadata.items())
+        return repr(user_metadata)
+
     async def get_session_memory_context(
         self, query, limit: int = 0, max_token_num: int = 0
     ) -> tuple[list[Episode], str]:
@@ -212,47 +255,80 @@ class SessionMemory:
         logger.debug("Get session for %s", query)
         async with self._lock:
             if self._summary_task is not None:
-                await self._summary_task
-                self._summary_task = None
-            length = (
-                self._compute_token_num(self._summary)
-                if self._summary is not None
-                else 0
-            )
-            episodes: deque[Episode] = deque()
-            for e in reversed(self._memory):
+                # Bound the wait so that a slow summary does not stall
+                # retrieval; the previous summary is used until then.
+                try:
+                    await asyncio.wait_for(
+                        asyncio.shield(self._summary_task),
+                        timeout=SessionMemory._summary_wait_timeout,
+                    )
+                except TimeoutError:
+                    pass
+                else:
+                    self._summary_task = None
+            length = self._summary_token_num
+            episodes: list[Episode] = []
+            # Bind the methods used in the loop to locals.
+            episode_tokens = self._episode_tokens
+            append_episode = episodes.append
+            recent_episodes: Iterable[Episode] = reversed(self._memory)
+            if limit > 0:
+                recent_episodes = islice(recent_episodes, limit)
+            for e in recent_episodes:
                 if length >= max_token_num > 0:
                     break
-                if len(episodes) >= limit > 0:
-                    break
-                token_num = self._compute_token_num(e)
+                token_num = episode_tokens(e)
                 if length + token_num > max_token_num > 0:
                     break
-                episodes.appendleft(e)
+                append_episode(e)
                 length += token_num
-            return list(episodes), self._summary
+            # Episodes were collected newest first.
+            episodes.reverse()
+            return episodes, self._summary
+
+    def _episode_tokens(self, episode: Episode, content_len: int | None = None) -> int:
+        """
+        Gets the number of tokens in an episode in memory,
+        computing it only once per episode.
+        """
+        token_num = self._token_cache.get(id(episode))
+        if token_num is None:
+            token_num = SessionMemory._compute_token_num(episode, content_len)
+            self._token_cache[id(episode)] = token_num
+            if len(self._token_cache) > 2 * self._capacity:
+                # Entries are removed as episodes leave memory,
+                # but bound the cache in case one is missed,
+                # dropping the oldest entry first.
+                del self._token_cache[next(iter(self._token_cache))]
+        return token_num
 
-    def _compute_token_num(self, episode: Episode | str) -> int:
+    @staticmethod
+    def _compute_token_num(
+        episode: Episode | str, content_len: int | None = None
+    ) -> int:
         """
         Computes the total number of tokens in an episodes.
+        content_len is the length of string content, if already known.
+        Values of str subclasses are measured by their repr().
         """
         result = 0
         if isinstance(episode, str):
-            return int(len(episode) / 4)  # 4 character per token
+            return len(episode) // 4  # 4 character per token
         if episode.content is None:
             return 0
-        if isinstance(episode.content, str):
-            result += len(episode.content)
+        content = episode.content
+        if type(content) is str:
+            result += len(content) if content_len is None else content_len
         else:
-            result += len(repr(episode.content))
-        if episode.user_metadata is None:
-            return int(result / 4)  # 4 character per token
-        if isinstance(episode.user_metadata, str):
-            result += len(episode.user_metadata)
-        elif isinstance(episode.user_metadata, dict):
-            for _, v in episode.user_metadata.items():
-                if isinstance(v, str):
+            result += len(repr(content))
+        user_metadata = episode.user_metadata
+        if type(user_metadata) is str:
+            result += len(user_metadata)
+        elif type(user_metadata) is dict:
+            # Only the values are counted, so the keys are not needed.
+            for v in user_metadata.values():
+                if type(v) is str:
                     result += len(v)
                 else:
                     result += len(repr(v))
-        return int(result / 4)  # 4 character per token
+        return result // 4  # 4 character per token
@@ -7,14 +7,18 @@ information extraction and a vector database for semantic search capabilities.
 """
 
 import asyncio
-import datetime
+import heapq
 import json
 import logging
-from itertools import accumulate, groupby, tee
+import re
+import time
+from dataclasses import dataclass
+from itertools import groupby
 from typing import Any
 
 import numpy as np
-from pydantic import BaseModel
+import orjson
+from pydantic import TypeAdapter
 
 from memmachine.common.data_types import ExternalServiceAPIError
 from memmachine.common.embedder.embedder import Embedder
@@ -26,6 +30,257 @@ from .util.lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+# Patterns for extracting JSON from language model responses,
+# compiled once at import.
+# Patterns for JSON wrapped in tags, in order of preference,
+# each with the opening tag that must be present for it to match.
+_TAGGED_JSON_PATTERNS = [
+    (opening_tag, re.compile(pattern, re.DOTALL))
+    for opening_tag, pattern in (
+        ("<OLD_PROFILE>", r"<OLD_PROFILE>\s*(\{.*?\})\s*</OLD_PROFILE>"),
+        ("<NEW_PROFILE>", r"<NEW_PROFILE>\s*(\{.*?\})\s*</NEW_PROFILE>"),
+        ("<profile>", r"<profile>\s*(\{.*?\})\s*</profile>"),
+        ("<json>", r"<json>\s*(\{.*?\})\s*</json>"),
+        ("```", r"```json\s*(\{.*?\})\s*```"),
+        ("```", r"```\s*(\{.*?\})\s*```"),
+        ("<think>", r"<think>\s*(\{.*?\})\s*</think>"),
+    )
+]
+# Finds all the opening tags above in a single scan of the response.
+_OPENING_TAG_PATTERN = re.compile(
+    "|".join(sorted({re.escape(tag) for tag, _ in _TAGGED_JSON_PATTERNS}))
+)
+_JSON_DECODER = json.JSONDecoder()
+_BRACE_PATTERN = re.compile(r"[{}]")
+# Common JSON syntax issues in language model responses,
+# matched in a single pass. Double-quoted strings are matched first
+# so that their contents are left untouched.
+_ELLIPSIS_NOTE = r"\.\.\.\s*\([^)]*\)"
+_LLM_JSON_FIX_PATTERN = re.compile(
+    r'(?P<string>"(?:[^"\\]|\\.)*")'
+    # e.g. "... (other tags remain the same)"
+    rf"|(?P<note>{_ELLIPSIS_NOTE})"
+    rf"|(?P<trailing_comma>,)(?=(?:\s|{_ELLIPSIS_NOTE})*[}}\]])"
+    # Property names only follow an opening brace or a comma.
+    r"|(?P<key_prefix>[{,]\s*)(?P<unquoted_key>\w+)\s*:\s*"
+    r"|'(?P<single_quoted>[^']*)'"
+    r"|`(?P<backtick_quoted>[^`]*)`",
+    re.DOTALL,
+)
+
+
+def _fix_llm_json_match(match: re.Match[str]) -> str:
+    match match.lastgroup:
+        case "string":
+            return match[0]
+        case "note" | "trailing_comma":
+            return ""
+        case "unquoted_key":
+            return f'{match["key_prefix"]}"{match["unquoted_key"]}": '
+        case "single_quoted":
+            return f'"{match["single_quoted"]}"'
+        case _:
+            return f'"{match["backtick_quoted"]}"'
+
+
+def _sanitize_llm_json(text: str) -> str:
+    """Fixes common JSON syntax issues in a language model response:
+    ellipsis notes, trailing commas, unquoted property names,
+    and single-quoted or backtick-quoted strings.
+    """
+    return _LLM_JSON_FIX_PATTERN.sub(_fix_llm_json_match, text)
+
+
+def _find_json_object(text: str) -> str | None:
+    """Returns the leftmost balanced {...} span in the text, if any.
+    Scans the braces once, so unlike a backtracking regex it stays linear
+    on responses with many unmatched braces.
+    """
+    open_positions: list[int] = []
+    first_span: tuple[int, int] | None = None
+    for match in _BRACE_PATTERN.finditer(text):
+        position = match.start()
+        if match[0] == "{":
+            open_positions.append(position)
+        elif open_positions:
+            start = open_positions.pop()
+            if first_span is None or start < first_span[0]:
+                first_span = (start, position + 1)
+            if not open_positions:
+                # Every earlier brace is closed, so no later span starts first.
+                break
+    if first_span is None:
+        return None
+    return text[first_span[0] : first_span[1]]
+
+
+def _extract_llm_json(response_text: str) -> tuple[str, str, Any]:
+    """Splits a language model response into its thinking and its JSON,
+    and fixes common JSON syntax issues in the JSON
+    if it does not parse as is.
+
+    Returns:
+        A tuple of the thinking, which may be empty, the JSON text,
+        and the parsed JSON, or None if the JSON needed fixing.
+    """
+    # Most responses are plain JSON, which needs no extraction or cleanup
+    try:
+        return "", response_text, orjson.loads(response_text)
+    except orjson.JSONDecodeError:
+        pass
+
+    # Try multiple parsing strategies to handle different response formats
+    thinking = ""
+    response_json = ""
+
+    # Strategy 1: Look for <think> tags
+    head, think_end, tail = response_text.rpartition("</think>")
+    if think_end and "<think>" in head:
+        thinking = head.removeprefix("<think>").strip()
+        response_json = tail
+    # Strategy 2: Look for JSON objects in the response
+    else:
+        # Try to extract JSON from the response by looking for common patterns
+        response_json = ""
+        opening_tags = set(_OPENING_TAG_PATTERN.findall(response_text))
+        for opening_tag, pattern in _TAGGED_JSON_PATTERNS:
+            if opening_tag not in opening_tags:
+                continue
+            match = pattern.search(response_text)
+            if match:
+                response_json = match.group(1).strip()
+                break
+
+        # If no tagged JSON found, try to find JSON at the end of the response
+        if not response_json:
+            # Look for a JSON object in the response,
+            # or if still no JSON found, use the entire response
+            response_json = (_find_json_object(response_text) or response_text).strip()
+
+    # Clean up common JSON syntax issues
+    if response_json:
+        try:
+            return thinking, response_json, orjson.loads(response_json)
+        except orjson.JSONDecodeError:
+            pass
+
+        response_json = _sanitize_llm_json(response_json)
+
+        # Fix incomplete JSON structures (e.g., missing closing braces)
+        missing_braces = response_json.count("{") - response_json.count("}")
+        if missing_braces > 0:
+            response_json += "}" * missing_braces
+
+        # Remove any remaining invalid characters
+        response_json = response_json.strip()
+    return thinking, response_json, None
+
+
+# Keys required in a profile update command, by the command's action.
+_UPDATE_COMMAND_KEYS = {
+    "add": frozenset({"command", "feature", "tag", "value"}),
+    "delete": frozenset({"command", "feature", "tag"}),
+}
+
+
+def _is_valid_update_command(command: Any) -> bool:
+    """Checks a profile update command with a single key set comparison."""
+    if not isinstance(command, dict):
+        return False
+    action = command.get("command")
+    required_keys = (
+        _UPDATE_COMMAND_KEYS.get(action) if isinstance(action, str) else None
+    )
+    return required_keys is not None and required_keys <= command.keys()
+
+
+def _log_invalid_update_command(command: Any) -> None:
+    """Logs why a profile update command is invalid."""
+    if not isinstance(command, dict):
+        logger.warning(
+            "AI response format incorrect: "
+            "expected profile update command to be dict, got %s %s",
+            type(command).__name__,
+            command,
+        )
+        return
+
+    if "command" not in command:
+        logger.warning(
+            "AI response format incorrect: missing 'command' key in %s",
+            command,
+        )
+        return
+
+    if command["command"] not in ("add", "delete"):
+        logger.warning(
+            "AI response format incorrect: "
+            "expected 'command' value in profile update command "
+            "to be 'add' or 'delete', got '%s'",
+            command["command"],
+        )
+        return
+
+    if "feature" not in command:
+        logger.warning(
+            "AI response format incorrect: missing 'feature' key in %s",
+            command,
+        )
+        return
+
+    if "tag" not in command:
+        logger.warning(
+            "AI response format incorrect: missing 'tag' key in %s",
+            command,
+        )
+        return
+
+    if command["command"] == "add" and "value" not in command:
+        logger.warning(
+            "AI response format incorrect: missing 'value' key in %s",
+            command,
+        )
+
+
+_CITATIONS_ADAPTER = TypeAdapter(list[int])
+
+
+@dataclass(slots=True)
+class _ConsolidateMemory:
+    """A consolidated profile feature from a language model response."""
+
+    tag: str
+    feature: str
+    value: str
+    citations: list[int]
+
+    @classmethod
+    def from_dict(cls, memory: Any) -> "_ConsolidateMemory":
+        """Parses a consolidated memory, raising ValueError if it is malformed."""
+        try:
+            tag, feature, value = memory["tag"], memory["feature"], memory["value"]
+            citations = memory["metadata"]["citations"]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"missing or invalid field {e}") from e
+        if not all(isinstance(field, str) for field in (tag, feature, value)):
+            raise ValueError("tag, feature and value must be strings")
+        if not isinstance(citations, list):
+            raise ValueError("citations must be a list")
+        # Coerce int-like citations such as "1" or 1.0,
+        # as language models do not always return bare ints.
+        # ValidationError is a ValueError.
+        return cls(tag, feature, value, _CITATIONS_ADAPTER.validate_python(citations))
+
+
+def _isolations_key(
+    isolations: dict[str, bool | int | float | str],
+) -> tuple[tuple[str, type, bool | int | float | str], ...]:
+    """Returns a hashable key for isolations, independent of their order.
+    The value types are part of the key so that, for example,
+    True and 1 do not share a cache entry.
+    """
+    return tuple(sorted((k, type(v), v) for k, v in isolations.items()))
+
 
 class ProfileUpdateTracker:
     """Tracks profile update activity for a user.
@@ -40,7 +295,7 @@ class ProfileUpdateTracker:
         self._message_limit: int = message_limit
         self._time_limit: float = time_limit_sec
         self._message_count: int = 0
-        self._first_updated: datetime.datetime | None = None
+        self._first_updated: float | None = None
 
     def mark_update(self):
         """Marks that a new message has been sent by the user.
@@ -49,7 +304,7 @@ class ProfileUpdateTracker:
         """
         self._message_count += 1
         if self._first_updated is None:
-            self._first_updated = datetime.datetime.now()
+            self._first_updated = time.monotonic()
 
     def _seconds_from_first_update(self) -> float | None:
         """Returns the number of seconds since the first message was sent.
@@ -57,8 +312,20 @@ class ProfileUpdateTracker:
         """
         if self._first_updated is None:
             return None
-        delta = datetime.datetime.now() - self._first_updated
-        return delta.total_seconds()
+        return time.monotonic() - self._first_updated
+
+    def deadline(self) -> float | None:
+        """Returns when the time limit since the first message is reached,
+        in seconds of time.monotonic().
+        If no messages have been sent, returns None.
+        """
+        if self._first_updated is None:
+            return None
+        return self._first_updated + self._time_limit
+
+    def exceeds_message_limit(self) -> bool:
+        """Returns whether the message count has reached the limit."""
+        return self._message_count >= self._message_limit
 
     def reset(self):
         """Resets the tracker state.
@@ -80,16 +347,24 @@ class ProfileUpdateTracker:
             return False
         elapsed = self._seconds_from_first_update()
         exceed_time_limit = elapsed is not None and elapsed >= self._time_limit
-        exceed_msg_limit = self._message_count >= self._message_limit
-        return exceed_time_limit or exceed_msg_limit
+        return exceed_time_limit or self.exceeds_message_limit()
 
 
 class ProfileUpdateTrackerManager:
-    """Manages ProfileUpdateTracker instances for multiple users."""
+    """Manages ProfileUpdateTracker instances for multiple users.
+    The methods run on the event loop and do not await while updating
+    the trackers, so each call is atomic with respect to other coroutines
+    and no lock is needed.
+    """
 
     def __init__(self, message_limit: int, time_limit_sec: float):
         self._trackers: dict[str, ProfileUpdateTracker] = {}
-        self._trackers_lock = asyncio.Lock()
+        # Users that may need an update, so that checking for updates
+        # does not have to go through every tracker.
+        # Heap of (deadline, user) pushed on each user's first message.
+        # Entries left over from before a reset are skipped when popped.
+        self._deadlines: list[tuple[float, str]] = []
+        self._over_message_limit: set[str] = set()
         self._message_limit = message_limit
         self._time_limit_sec = time_limit_sec
 
@@ -104,23 +379,35 @@ class ProfileUpdateTrackerManager:
         """Marks that a new message has been sent by the user.
         Creates a new tracker if one does not exist for the user.
         """
-        async with self._trackers_lock:
-            if user not in self._trackers:
-                self._trackers[user] = self._new_tracker(user)
-            self._trackers[user].mark_update()
+        tracker = self._trackers.get(user)
+        if tracker is None:
+            tracker = self._trackers[user] = self._new_tracker(user)
+        is_first_update = tracker.deadline() is None
+        tracker.mark_update()
+        deadline = tracker.deadline()
+        if is_first_update and deadline is not None:
+            heapq.heappush(self._deadlines, (deadline, user))
+        if tracker.exceeds_message_limit():
+            self._over_message_limit.add(user)
 
     async def get_users_to_update(self) -> list[str]:
         """Returns a list of users whose profiles need to be updated.
         A profile update is needed if the user's tracker indicates
         that an update should be triggered.
         """
-        async with self._trackers_lock:
-            ret = []
-            for user, tracker in self._trackers.items():
-                if tracker.should_update():
-                    ret.append(user)
-                    tracker.reset()
-            return ret
+        candidates = self._over_message_limit
+        self._over_message_limit = set()
+        now = time.monotonic()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            candidates.add(heapq.heappop(self._deadlines)[1])
+
+        ret = []
+        for user in candidates:
+            tracker = self._trackers[user]
+            if tracker.should_update():
+                ret.append(user)
+                tracker.reset()
+        return ret
 
 
 class ProfileMemory:
@@ -169,6 +456,10 @@ class ProfileMemory:
     the first message, their profile will be updated.
     """
 
+    QUERY_EMBEDDING_CACHE_SIZE = 1024
+    """ Number of search query embeddings kept for repeated queries.
+    """
+
     def __init__(
         self,
         *,
@@ -204,6 +495,7 @@ class ProfileMemory:
         self._ingestion_task = asyncio.create_task(self._background_ingestion_task())
         self._is_shutting_down = False
         self._profile_cache = LRUCache(self._max_cache_size)
+        self._query_embedding_cache = LRUCache(self.QUERY_EMBEDDING_CACHE_SIZE)
 
     async def startup(self):
         """Initializes resources, such as the database connection pool."""
@@ -233,16 +525,17 @@ class ProfileMemory:
         """
         if isolations is None:
             isolations = {}
-        profile = self._profile_cache.get((user_id, json.dumps(isolations)))
+        cache_key = (user_id, _isolations_key(isolations))
+        profile = self._profile_cache.get(cache_key)
         if profile is not None:
             return profile
         profile = await self._profile_storage.get_profile(user_id, isolations)
-        self._profile_cache.put((user_id, json.dumps(isolations)), profile)
+        self._profile_cache.put(cache_key, profile)
         return profile
 
     async def delete_all(self):
         """Deletes all user profiles from the database and clears the cache."""
-        self._profile_cache = LRUCache(self._max_cache_size)
+        self._profile_cache.clear()
         await self._profile_storage.delete_all()
 
     async def delete_user_profile(
@@ -258,7 +551,7 @@ class ProfileMemory:
         """
         if isolations is None:
             isolations = {}
-        self._profile_cache.erase((user_id, json.dumps(isolations)))
+        self._profile_cache.erase((user_id, _isolations_key(isolations)))
         await self._profile_storage.delete_profile(user_id, isolations)
 
     async def add_new_profile(
@@ -292,14 +585,50 @@ class ProfileMemory:
             metadata = {}
         if citations is None:
             citations = []
-        self._profile_cache.erase((user_id, json.dumps(isolations)))
         emb = (await self._embeddings.ingest_embed([value]))[0]
+        await self._add_profile_feature(
+            user_id,
+            feature,
+            value,
+            tag,
+            emb,
+            metadata=metadata,
+            isolations=isolations,
+            citations=citations,
+        )
+
+    async def _add_profile_feature(
+        self,
+        user_id: str,
+        feature: str,
+        value: str,
+        tag: str,
+        embedding: list[float],
+        metadata: dict[str, str] | None = None,
+        isolations: dict[str, bool | int | float | str] | None = None,
+        citations: list[int] | None = None,
+    ):
+        # pylint: disable=too-many-arguments
+        # pylint: disable=too-many-positional-arguments
+        """Adds a new feature with an already computed embedding
+        to a user's profile.
+
+        This lets callers adding several features embed their values
+        in a single request.
+        """
+        if isolations is None:
+            isolations = {}
+        if metadata is None:
+            metadata = {}
+        if citations is None:
+            citations = []
+        self._profile_cache.erase((user_id, _isolations_key(isolations)))
         await self._profile_storage.add_profile_feature(
             user_id,
             feature,
             value,
             tag,
-            np.array(emb),
+            np.asarray(embedding, dtype=np.float32),
             metadata=metadata,
             isolations=isolations,
             citations=citations,
@@ -327,7 +656,7 @@ class ProfileMemory:
         """
         if isolations is None:
             isolations = {}
-        self._profile_cache.erase((user_id, json.dumps(isolations)))
+        self._profile_cache.erase((user_id, _isolations_key(isolations)))
         await self._profile_storage.delete_profile_feature(
             user_id, feature, tag, value, isolations
         )
@@ -355,19 +684,34 @@ class ProfileMemory:
         Returns:
             A filtered list of entries.
         """
-        if len(arr) == 0:
+        if len(arr) == 0 or max_std <= 0:
             return []
+        if len(arr) == 1:
+            # A single score has no spread,
+            # and is within any positive range of itself.
+            return [arr[0][1]] if max_range > 0 else []
         new_min = arr[0][0] - max_range
-        k, v = zip(*arr)
-        k1, k2, _, k4 = tee(k, 4)
-        sums = accumulate(k1)
-        square_sums = accumulate(i * i for i in k2)
-        divs = range(1, len(arr) + 1)
-        take = max(
-            (d if ((sq - s * s / d) / d) ** 0.5 < max_std else -1)
-            for (s, sq, d) in zip(sums, square_sums, divs)
+        scores = np.fromiter(
+            (score for score, _ in arr), dtype=np.float64, count=len(arr)
         )
-        return [val for (f, val, _) in zip(k4, v, range(take)) if f > new_min]
+        # Variance of each prefix of the scores, multiplied by the prefix
+        # length and compared against max_std squared times the length,
+        # to avoid square roots and divisions.
+        # Computed in place to avoid temporary arrays.
+        lengths = np.arange(1, len(arr) + 1, dtype=np.float64)
+        sums = np.cumsum(scores)
+        square_sums = np.square(scores)
+        np.cumsum(square_sums, out=square_sums)
+        np.square(sums, out=sums)
+        sums /= lengths
+        square_sums -= sums
+        lengths *= max_std * max_std
+        prefix_ends = np.flatnonzero(square_sums < lengths)
+        if len(prefix_ends) == 0:
+            return []
+        take = int(prefix_ends[-1]) + 1
+        keep = np.flatnonzero(scores[:take] > new_min)
+        return [arr[i][1] for i in keep.tolist()]
 
     async def semantic_search(
         self,
@@ -393,12 +737,16 @@ class ProfileMemory:
         Returns:
             A list of matching profile entries, filtered by similarity scores.
         """
-        # TODO: cache this # pylint: disable=fixme
         if isolations is None:
             isolations = {}
-        qemb = (await self._embeddings.search_embed([query]))[0]
+        qemb = self._query_embedding_cache.get(query)
+        if qemb is None:
+            qemb = np.asarray(
+                (await self._embeddings.search_embed([query]))[0], dtype=np.float32
+            )
+            self._query_embedding_cache.put(query, qemb)
         candidates = await self._profile_storage.semantic_search(
-            user_id, np.array(qemb), k, min_cos, isolations
+            user_id, qemb, k, min_cos, isolations
         )
         formatted = [(i["metadata"]["similarity_score"], i) for i in candidates]
         return self.range_filter(formatted, max_range, max_std)
@@ -497,13 +845,13 @@ class ProfileMemory:
             user_id=user_id,
             k=100,
             is_ingested=False,
+            order_by_isolations=True,
         )
 
         def key_fn(r):
-            # normalize JSONB dict to a stable string key
-            return json.dumps(r["isolations"], sort_keys=True)
+            # normalize JSONB dict to a stable bytes key
+            return orjson.dumps(r["isolations"], option=orjson.OPT_SORT_KEYS)
 
-        rows = sorted(rows, key=key_fn)
         return [list(group) for _, group in groupby(rows, key_fn)]
 
     async def _process_uningested_memories(
@@ -526,6 +874,10 @@ class ProfileMemory:
                 return
 
             logger.debug("ProfileMemory - Processing %d messages", len(messages))
+            # Messages are processed in order, since each update builds on
+            # the profile left by the previous one. Marking a message as
+            # ingested is started right away, so that it overlaps with
+            # the language model call for the next message.
             mark_tasks = []
 
             for i in range(0, len(messages) - 1):
@@ -535,7 +887,9 @@ class ProfileMemory:
                 )
                 await self._update_user_profile_think(message)
                 mark_tasks.append(
-                    self._profile_storage.mark_messages_ingested([message["id"]])
+                    asyncio.create_task(
+                        self._profile_storage.mark_messages_ingested([message["id"]])
+                    )
                 )
 
             logger.debug(
@@ -566,7 +920,7 @@ class ProfileMemory:
         # TODO: These really should not be raw data structures.
         citation_id = record["id"]  # Think this is an int
         user_id = record["user_id"]
-        isolations = json.loads(record["isolations"])
+        isolations = orjson.loads(record["isolations"])
         # metadata = json.loads(record["metadata"])
 
         profile = await self.get_user_profile(user_id, isolations)
@@ -607,76 +961,9 @@ class ProfileMemory:
             return
 
         # Get thinking and JSON from language model response.
-        # Try multiple parsing strategies to handle different response formats
-        thinking = ""
-        response_json = ""
-
-        # Strategy 1: Look for <think> tags
-        if "<think>" in response_text and "</think>" in response_text:
-            thinking, _, response_json = response_text.removeprefix(
-                "<think>"
-            ).rpartition("</think>")
-            thinking = thinking.strip()
-        # Strategy 2: Look for JSON objects in the response
-        else:
-            # Try to extract JSON from the response by looking for common patterns
-            import re
-
-            # Look for JSON objects wrapped in various tags
-            json_patterns = [
-                r"<OLD_PROFILE>\s*(\{.*?\})\s*</OLD_PROFILE>",
-                r"<NEW_PROFILE>\s*(\{.*?\})\s*</NEW_PROFILE>",
-                r"<profile>\s*(\{.*?\})\s*</profile>",
-                r"<json>\s*(\{.*?\})\s*</json>",
-                r"```json\s*(\{.*?\})\s*```",
-                r"```\s*(\{.*?\})\s*```",
-                r"<think>\s*(\{.*?\})\s*</think>",
-            ]
-
-            response_json = ""
-            for pattern in json_patterns:
-                match = re.search(pattern, response_text, re.DOTALL)
-                if match:
-                    response_json = match.group(1).strip()
-                    break
-
-            # If no tagged JSON found, try to find JSON at the end of the response
-            if not response_json:
-                # Look for the last JSON object in the response
-                json_match = re.search(
-                    r"(\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\})", response_text
-                )
-                if json_match:
-                    response_json = json_match.group(1).strip()
-                else:
-                    # If still no JSON found, use the entire response
-                    response_json = response_text.strip()
-
-        # Clean up common JSON syntax issues
-        if response_json:
-            # Remove invalid syntax like "... (other tags remain the same)"
-            response_json = re.sub(r"\.\.\.\s*\([^)]*\)", "", response_json)
-            # Remove trailing commas before closing braces
-            response_json = re.sub(r",(\s*[}\]])", r"\1", response_json)
-
-            # Fix common LLM JSON formatting issues
-            # Fix unquoted property names (e.g., tag: "value" -> "tag": "value")
-            response_json = re.sub(r"(\w+):\s*", r'"\1": ', response_json)
-
-            # Fix single quotes to double quotes
-            response_json = re.sub(r"'([^']*)'", r'"\1"', response_json)
-
-            # Fix backticks to double quotes
-            response_json = re.sub(r"`([^`]*)`", r'"\1"', response_json)
-
-            # Fix incomplete JSON structures (e.g., missing closing braces)
-            open_braces = response_json.count("{")
-            close_braces = response_json.count("}")
-            if open_braces > close_braces:
-                response_json += "}" * (open_braces - close_braces)
-
-            # Remove any remaining invalid characters
-            response_json = response_json.strip()
+        thinking, response_json, profile_update_commands = _extract_llm_json(
+            response_text
+        )
 
         logger.debug(
             "ProfileMemory - Extracted JSON for user %s: %s", user_id, response_json
@@ -684,7 +971,8 @@ class ProfileMemory:
 
         # TODO: These really should not be raw data structures.
         try:
-            profile_update_commands = json.loads(response_json)
+            if profile_update_commands is None:
+                profile_update_commands = orjson.loads(response_json)
             logger.debug(
                 "ProfileMemory - Successfully parsed JSON for user %s: %s",
                 user_id,
@@ -702,47 +990,19 @@ class ProfileMemory:
             try:
                 # Try to find and extract JSON objects
                 json_objects = []
-                brace_count = 0
-                current_json = ""
-                in_string = False
-                escape_next = False
-
-                for char in response_json:
-                    if escape_next:
-                        current_json += char
-                        escape_next = False
-                        continue
-
-                    if char == "\\":
-                        escape_next = True
-                        current_json += char
-                        continue
-
-                    if char == '"' and not escape_next:
-                        in_string = not in_string
-
-                    current_json += char
-
-                    if not in_string:
-                        if char == "{":
-                            brace_count += 1
-                        elif char == "}":
-                            brace_count -= 1
-                            if brace_count == 0 and current_json.strip():
-                                # Found a complete JSON object
-                                try:
-                                    obj = json.loads(current_json.strip())
-                                    json_objects.append(obj)
-                                except (
-                                    json.JSONDecodeError,
-                                    ValueError,
-                                ) as decode_error:
-                                    # Ignore malformed JSON fragments; continue scanning
-                                    logger.debug(
-                                        "Skipping invalid JSON object during extraction: %s",
-                                        str(decode_error),
-                                    )
-                                current_json = ""
+                idx = response_json.find("{")
+                while idx != -1:
+                    try:
+                        obj, idx = _JSON_DECODER.raw_decode(response_json, idx)
+                        json_objects.append(obj)
+                    except json.JSONDecodeError as decode_error:
+                        # Ignore malformed JSON fragments; continue scanning
+                        logger.debug(
+                            "Skipping invalid JSON object during extraction: %s",
+                            str(decode_error),
+                        )
+                        idx += 1
+                    idx = response_json.find("{", idx)
 
                 if json_objects:
                     # Combine all valid JSON objects into one
@@ -774,14 +1034,15 @@ class ProfileMemory:
                 profile_update_commands = {}
                 return
         finally:
-            logger.info(
-                "PROFILE MEMORY INGESTOR",
-                extra={
-                    "queries_to_ingest": memory_content,
-                    "thoughts": thinking,
-                    "outputs": profile_update_commands,
-                },
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "PROFILE MEMORY INGESTOR",
+                    extra={
+                        "queries_to_ingest": memory_content,
+                        "thoughts": thinking,
+                        "outputs": profile_update_commands,
+                    },
+                )
 
         # This should probably just be a list of commands
         # instead of a dictionary mapping
@@ -800,59 +1061,25 @@ class ProfileMemory:
 
         valid_commands = []
         for command in commands:
-            if not isinstance(command, dict):
-                logger.warning(
-                    "AI response format incorrect: "
-                    "expected profile update command to be dict, got %s %s",
-                    type(command).__name__,
-                    command,
-                )
-                continue
-
-            if "command" not in command:
-                logger.warning(
-                    "AI response format incorrect: missing 'command' key in %s",
-                    command,
-                )
-                continue
-
-            if command["command"] not in ("add", "delete"):
-                logger.warning(
-                    "AI response format incorrect: "
-                    "expected 'command' value in profile update command "
-                    "to be 'add' or 'delete', got '%s'",
-                    command["command"],
-                )
-                continue
-
-            if "feature" not in command:
-                logger.warning(
-                    "AI response format incorrect: missing 'feature' key in %s",
-                    command,
-                )
-                continue
-
-            if "tag" not in command:
-                logger.warning(
-                    "AI response format incorrect: missing 'tag' key in %s",
-                    command,
-                )
-                continue
-
-            if command["command"] == "add" and "value" not in command:
-                logger.warning(
-                    "AI response format incorrect: missing 'value' key in %s",
-                    command,
-                )
-                continue
-
-            valid_commands.append(command)
+            if _is_valid_update_command(command):
+                valid_commands.append(command)
+            else:
+                _log_invalid_update_command(command)
 
         logger.debug(
             "ProfileMemory - Executing %d valid commands for user %s",
             len(valid_commands),
             user_id,
         )
+        # Embed the values of all added features in a single request.
+        add_values = [
+            command["value"]
+            for command in valid_commands
+            if command["command"] == "add"
+        ]
+        add_embeddings = iter(
+            await self._embeddings.ingest_embed(add_values) if add_values else []
+        )
         for command in valid_commands:
             if command["command"] == "add":
                 logger.debug(
@@ -860,11 +1087,12 @@ class ProfileMemory:
                     user_id,
                     command,
                 )
-                await self.add_new_profile(
+                await self._add_profile_feature(
                     user_id,
                     command["feature"],
                     command["value"],
                     command["tag"],
+                    next(add_embeddings),
                     citations=[citation_id],
                     isolations=isolations,
                     # metadata=metadata
@@ -898,21 +1126,28 @@ class ProfileMemory:
                 user_id, thresh=5, isolations=isolations
             )
             await asyncio.gather(
-                *[self._deduplicate_profile(user_id, section) for section in s]
+                *[
+                    self._deduplicate_profile(user_id, section, isolations)
+                    for section in s
+                ]
             )
 
     async def _deduplicate_profile(
         self,
         user_id: str,
         memories: list[dict[str, Any]],
+        isolations: dict[str, bool | int | float | str] | None = None,
     ):
         """
         sends a list of features to an llm to consolidated
         """
+        if isolations is None:
+            isolations = {}
         try:
             response_text, _ = await self._model.generate_response(
                 system_prompt=self._consolidation_prompt,
-                user_prompt=json.dumps(memories),
+                # orjson output is compact, which keeps the prompt short.
+                user_prompt=orjson.dumps(memories).decode(),
             )
             logger.debug(
                 "ProfileMemory - Raw LLM response for consolidation: %s", response_text
@@ -922,82 +1157,16 @@ class ProfileMemory:
             return
 
         # Get thinking and JSON from language model response.
-        # Try multiple parsing strategies to handle different response formats
-        thinking = ""
-        response_json = ""
-
-        # Strategy 1: Look for <think> tags
-        if "<think>" in response_text and "</think>" in response_text:
-            thinking, _, response_json = response_text.removeprefix(
-                "<think>"
-            ).rpartition("</think>")
-            thinking = thinking.strip()
-        # Strategy 2: Look for JSON objects in the response
-        else:
-            # Try to extract JSON from the response by looking for common patterns
-            import re
-
-            # Look for JSON objects wrapped in various tags
-            json_patterns = [
-                r"<OLD_PROFILE>\s*(\{.*?\})\s*</OLD_PROFILE>",
-                r"<NEW_PROFILE>\s*(\{.*?\})\s*</NEW_PROFILE>",
-                r"<profile>\s*(\{.*?\})\s*</profile>",
-                r"<json>\s*(\{.*?\})\s*</json>",
-                r"```json\s*(\{.*?\})\s*```",
-                r"```\s*(\{.*?\})\s*```",
-                r"<think>\s*(\{.*?\})\s*</think>",
-            ]
-
-            response_json = ""
-            for pattern in json_patterns:
-                match = re.search(pattern, response_text, re.DOTALL)
-                if match:
-                    response_json = match.group(1).strip()
-                    break
-
-            # If no tagged JSON found, try to find JSON at the end of the response
-            if not response_json:
-                # Look for the last JSON object in the response
-                json_match = re.search(
-                    r"(\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\})", response_text
-                )
-                if json_match:
-                    response_json = json_match.group(1).strip()
-                else:
-                    # If still no JSON found, use the entire response
-                    response_json = response_text.strip()
-
-        # Clean up common JSON syntax issues
-        if response_json:
-            # Remove invalid syntax like "... (other tags remain the same)"
-            response_json = re.sub(r"\.\.\.\s*\([^)]*\)", "", response_json)
-            # Remove trailing commas before closing braces
-            response_json = re.sub(r",(\s*[}\]])", r"\1", response_json)
-
-            # Fix common LLM JSON formatting issues
-            # Fix unquoted property names (e.g., tag: "value" -> "tag": "value")
-            response_json = re.sub(r"(\w+):\s*", r'"\1": ', response_json)
-
-            # Fix single quotes to double quotes
-            response_json = re.sub(r"'([^']*)'", r'"\1"', response_json)
-
-            # Fix backticks to double quotes
-            response_json = re.sub(r"`([^`]*)`", r'"\1"', response_json)
-
-            # Fix incomplete JSON structures (e.g., missing closing braces)
-            open_braces = response_json.count("{")
-            close_braces = response_json.count("}")
-            if open_braces > close_braces:
-                response_json += "}" * (open_braces - close_braces)
-
-            # Remove any remaining invalid characters
-            response_json = response_json.strip()
+        thinking, response_json, updated_profile_entries = _extract_llm_json(
+            response_text
+        )
 
         logger.debug(
             "ProfileMemory - Extracted JSON for consolidation: %s", response_json
         )
         try:
-            updated_profile_entries = json.loads(response_json)
+            if updated_profile_entries is None:
+                updated_profile_entries = orjson.loads(response_json)
             logger.debug(
                 "ProfileMemory - Successfully parsed JSON for consolidation: %s",
                 updated_profile_entries,
@@ -1013,14 +1182,15 @@ class ProfileMemory:
             updated_profile_entries = {}
             return
         finally:
-            logger.info(
-                "PROFILE MEMORY CONSOLIDATOR",
-                extra={
-                    "receives": memories,
-                    "thoughts": thinking,
-                    "outputs": updated_profile_entries,
-                },
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "PROFILE MEMORY CONSOLIDATOR",
+                    extra={
+                        "receives": memories,
+                        "thoughts": thinking,
+                        "outputs": updated_profile_entries,
+                    },
+                )
 
         if not isinstance(updated_profile_entries, dict):
             logger.warning(
@@ -1072,7 +1242,7 @@ class ProfileMemory:
             keep_all_memories = True
 
         if not keep_all_memories:
-            valid_keep_memories = []
+            valid_keep_memories: set[int] = set()
             for memory_id in keep_memories:
                 if not isinstance(memory_id, int):
                     logger.warning(
@@ -1083,67 +1253,94 @@ class ProfileMemory:
                     )
                     continue
 
-                valid_keep_memories.append(memory_id)
+                valid_keep_memories.add(memory_id)
 
-            for memory in memories:
-                if memory["metadata"]["id"] not in valid_keep_memories:
-                    self._profile_cache.erase(user_id)
-                    await self._profile_storage.delete_profile_feature_by_id(
-                        memory["metadata"]["id"]
+            delete_ids = [
+                memory["metadata"]["id"]
+                for memory in memories
+                if memory["metadata"]["id"] not in valid_keep_memories
+            ]
+            if delete_ids:
+                await asyncio.gather(
+                    *(
+                        self._profile_storage.delete_profile_feature_by_id(memory_id)
+                        for memory_id in delete_ids
                     )
+                )
+                # Invalidate once all deletions are done,
+                # so that no read in between caches deleted features.
+                self._profile_cache.erase((user_id, _isolations_key(isolations)))
 
-        class ConsolidateMemoryMetadata(BaseModel):
-            citations: list[int]
-
-        class ConsolidateMemory(BaseModel):
-            tag: str
-            feature: str
-            value: str
-            metadata: ConsolidateMemoryMetadata
-
+        parsed_memories = []
         for memory in consolidate_memories:
             try:
-                consolidate_memory = ConsolidateMemory(**memory)
-            except Exception as e:
+                parsed_memories.append(_ConsolidateMemory.from_dict(memory))
+            except ValueError as e:
                 logger.warning(
                     "AI response format incorrect: unable to parse memory %s, error %s",
                     memory,
                     str(e),
                 )
-                continue
 
+        # Embed the values of all consolidated features in a single request.
+        embeddings = (
+            await self._embeddings.ingest_embed(
+                [consolidate_memory.value for consolidate_memory in parsed_memories]
+            )
+            if parsed_memories
+            else []
+        )
+
+        async def add_consolidated_memory(consolidate_memory, embedding):
             associations = await self._profile_storage.get_all_citations_for_ids(
-                consolidate_memory.metadata.citations
+                consolidate_memory.citations
             )
 
             new_citations = [i[0] for i in associations]
 
             # a derivative shall contain all routing information of its
             # components that do not mutually conflict.
-            new_isolations: dict[str, bool | int | float | str] = {}
-            bad = set()
-            for i in associations:
-                for k, v in i[1].items():
-                    old_val = new_isolations.get(k)
-                    if old_val is None:
-                        new_isolations[k] = v
-                    elif old_val != v:
-                        bad.add(k)
-            for k in bad:
-                del new_isolations[k]
-            logger.debug(
-                "CITATION_CHECK",
-                extra={
-                    "content_citations": new_citations,
-                    "profile_citations": consolidate_memory.metadata.citations,
-                    "think": thinking,
-                },
-            )
-            await self.add_new_profile(
+            # Maps each key to its value and whether all components agree.
+            merged: dict[str, tuple[bool | int | float | str, bool]] = {}
+            for _, isolations in associations:
+                for k, v in isolations.items():
+                    prev = merged.get(k)
+                    if prev is None:
+                        merged[k] = (v, True)
+                    elif prev[1] and prev[0] != v:
+                        merged[k] = (v, False)
+            new_isolations = {k: v for k, (v, agreed) in merged.items() if agreed}
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "CITATION_CHECK",
+                    extra={
+                        "content_citations": new_citations,
+                        "profile_citations": consolidate_memory.citations,
+                        "think": thinking,
+                    },
+                )
+            await self._add_profile_feature(
                 user_id,
                 consolidate_memory.feature,
                 consolidate_memory.value,
                 consolidate_memory.tag,
+                embedding,
                 citations=new_citations,
                 isolations=new_isolations,
             )
+
+        # Add the consolidated features concurrently.
+        results = await asyncio.gather(
+            *(
+                add_consolidated_memory(consolidate_memory, embedding)
+                for consolidate_memory, embedding in zip(parsed_memories, embeddings)
+            ),
+            return_exceptions=True,
+        )
+        for consolidate_memory, result in zip(parsed_memories, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    "Error when adding consolidated memory %s: %s",
+                    consolidate_memory,
+                    str(result),
+                )
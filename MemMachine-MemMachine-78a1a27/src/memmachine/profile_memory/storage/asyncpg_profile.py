@@ -396,7 +396,6 @@ class AsyncPgProfileStorage(ProfileStorageBase):
                 WHERE p.user_id = $2
                 AND -(p.embedding <#> $1::vector) > $3
                 AND p.isolations @> $4
-                GROUP BY p.tag, p.feature, p.value, p.id, p.embedding
                 ORDER BY -(p.embedding <#> $1::vector) DESC
                 LIMIT $5
                 """,
@@ -458,13 +457,21 @@ class AsyncPgProfileStorage(ProfileStorageBase):
         user_id: str,
         k: int = 10,
         is_ingested: bool = False,
+        order_by_isolations: bool = False,
     ) -> list[Mapping[str, Any]]:
         stm = f"""
-            SELECT id, user_id, content, metadata, isolations FROM {self.history_table}
+            SELECT id, user_id, content, metadata, isolations, create_at
+            FROM {self.history_table}
             WHERE user_id = $1 AND ingested = $2
             ORDER BY create_at DESC
             LIMIT $3
         """
+        if order_by_isolations:
+            # Order the most recent k messages, not the whole history.
+            stm = f"""
+                SELECT id, user_id, content, metadata, isolations FROM ({stm}) AS h
+                ORDER BY isolations::text, create_at DESC
+            """
         assert self._pool is not None
         async with self._pool.acquire() as conn:
             rows = await conn.fetch(stm, user_id, is_ingested, k)
@@ -148,10 +148,14 @@ class ProfileStorageBase(ABC):
         user_id: str,
         k: int = 0,
         is_ingested: bool = False,
+        order_by_isolations: bool = False,
     ) -> list[Mapping[str, Any]]:
         """
         retrieve the list of the history messages for the user
-        with the ingestion status, up to k messages if k > 0
+        with the ingestion status, up to k messages if k > 0.
+        The most recent messages are returned first; with
+        order_by_isolations, messages with the same isolations
+        are also made adjacent
         """
         raise NotImplementedError
 
@@ -1261,7 +1261,11 @@ async def get_all_sessions() -> AllSessionsResponse:
     """
     Get all sessions
     """
-    sessions = cast(EpisodicMemoryManager, episodic_memory).get_all_sessions()
+    # Query the session database in a worker thread
+    # so that concurrent requests do not block the event loop.
+    sessions = await asyncio.to_thread(
+        cast(EpisodicMemoryManager, episodic_memory).get_all_sessions
+    )
     return AllSessionsResponse(
         sessions=[
             MemorySession(
@@ -1280,7 +1284,9 @@ async def get_sessions_for_user(user_id: str) -> AllSessionsResponse:
     """
     Get all sessions for a particular user
     """
-    sessions = cast(EpisodicMemoryManager, episodic_memory).get_user_sessions(user_id)
+    sessions = await asyncio.to_thread(
+        cast(EpisodicMemoryManager, episodic_memory).get_user_sessions, user_id
+    )
     return AllSessionsResponse(
         sessions=[
             MemorySession(
@@ -1299,7 +1305,9 @@ async def get_sessions_for_group(group_id: str) -> AllSessionsResponse:
     """
     Get all sessions for a particular group
     """
-    sessions = cast(EpisodicMemoryManager, episodic_memory).get_group_sessions(group_id)
+    sessions = await asyncio.to_thread(
+        cast(EpisodicMemoryManager, episodic_memory).get_group_sessions, group_id
+    )
     return AllSessionsResponse(
         sessions=[
             MemorySession(
@@ -1318,7 +1326,9 @@ async def get_sessions_for_agent(agent_id: str) -> AllSessionsResponse:
     """
     Get all sessions for a particular agent
     """
-    sessions = cast(EpisodicMemoryManager, episodic_memory).get_agent_sessions(agent_id)
+    sessions = await asyncio.to_thread(
+        cast(EpisodicMemoryManager, episodic_memory).get_agent_sessions, agent_id
+    )
     return AllSessionsResponse(
         sessions=[
             MemorySession(
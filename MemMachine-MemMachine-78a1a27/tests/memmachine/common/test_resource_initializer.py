@@ -0,0 +1,109 @@
+import threading
+from typing import Any
+
+import pytest
+
+from memmachine.common import resource_initializer
+from memmachine.common.builder import Builder
+from memmachine.common.resource_initializer import ResourceInitializer
+
+
+class FakeBuilder(Builder):
+    @staticmethod
+    def get_dependency_ids(name: str, config: dict[str, Any]) -> set[str]:
+        return set(config.get("dependency_ids", []))
+
+    @staticmethod
+    def build(name: str, config: dict[str, Any], injections: dict[str, Any]) -> Any:
+        barrier = config.get("barrier")
+        if barrier is not None:
+            # Raises BrokenBarrierError unless the other builds
+            # reach the barrier before its timeout.
+            barrier.wait()
+        return {
+            "name": name,
+            "dependencies": {
+                dependency_id: injections[dependency_id]
+                for dependency_id in config.get("dependency_ids", [])
+            },
+        }
+
+
+@pytest.fixture(autouse=True)
+def fake_builder(monkeypatch):
+    monkeypatch.setitem(resource_initializer.resource_builder_map, "fake", FakeBuilder)
+
+
+def fake_definition(
+    name: str, dependency_ids: list[str] | None = None, **config: Any
+) -> dict[str, Any]:
+    return {
+        "type": "fake",
+        "name": name,
+        "config": {"dependency_ids": dependency_ids or [], **config},
+    }
+
+
+def test_initialize_injects_dependencies():
+    resources = ResourceInitializer.initialize(
+        {
+            "c": fake_definition("c", ["a", "b"]),
+            "a": fake_definition("a"),
+            "b": fake_definition("b", ["a"]),
+            "d": fake_definition("d"),
+        }
+    )
+
+    assert set(resources.keys()) == {"a", "b", "c", "d"}
+    assert resources["b"]["dependencies"]["a"] is resources["a"]
+    assert resources["c"]["dependencies"]["a"] is resources["a"]
+    assert resources["c"]["dependencies"]["b"] is resources["b"]
+
+
+def test_initialize_builds_independent_resources_concurrently():
+    # Both builds must wait at the barrier at the same time.
+    barrier = threading.Barrier(2, timeout=5)
+
+    resources = ResourceInitializer.initialize(
+        {
+            "a": fake_definition("a"),
+            "b": fake_definition("b", ["a"], barrier=barrier),
+            "c": fake_definition("c", ["a"], barrier=barrier),
+        }
+    )
+
+    assert set(resources.keys()) == {"a", "b", "c"}
+    assert resources["b"]["dependencies"]["a"] is resources["a"]
+    assert resources["c"]["dependencies"]["a"] is resources["a"]
+
+
+def test_initialize_uses_resource_cache():
+    cached_resource = object()
+
+    resources = ResourceInitializer.initialize(
+        {
+            "a": fake_definition("a"),
+            "b": fake_definition("b", ["a", "cached"]),
+        },
+        {"a": cached_resource, "cached": cached_resource},
+    )
+
+    assert set(resources.keys()) == {"b"}
+    assert resources["b"]["dependencies"]["a"] is cached_resource
+    assert resources["b"]["dependencies"]["cached"] is cached_resource
+
+
+def test_initialize_missing_dependency():
+    with pytest.raises(ValueError):
+        ResourceInitializer.initialize({"a": fake_definition("a", ["missing"])})
+
+
+def test_initialize_cyclic_dependency():
+    with pytest.raises(ValueError):
+        ResourceInitializer.initialize(
+            {
+                "a": fake_definition("a", ["b"]),
+                "b": fake_definition("b", ["a"]),
+                "c": fake_definition("c"),
+            }
+        )
@@ -327,6 +327,59 @@ async def test_search_similar_nodes(vector_graph_store, vector_graph_store_ann):
     )
     assert 0 < len(results) <= 5
 
+    results = await vector_graph_store_ann.search_similar_nodes(
+        query_embedding=[1.0, 0.0],
+        embedding_property_name="embedding1",
+        similarity_metric=SimilarityMetric.COSINE,
+        limit=1,
+        required_labels=["Entity"],
+        required_properties={"include?": "yes"},
+        num_ann_candidates=6,
+    )
+    assert len(results) == 1
+    assert results[0].properties["name"] == "Node2"
+
+
+@pytest.mark.asyncio
+async def test_search_similar_nodes_quantized_index(neo4j_driver):
+    vector_graph_store_quantized = Neo4jVectorGraphStore(
+        Neo4jVectorGraphStoreParams(
+            driver=neo4j_driver,
+            force_exact_similarity_search=False,
+            vector_index_quantization_enabled=True,
+        )
+    )
+
+    await vector_graph_store_quantized.add_nodes(
+        [
+            Node(
+                uuid=uuid4(),
+                labels=["Entity"],
+                properties={"name": "Node1", "embedding": [1000.0, 0.0]},
+            ),
+            Node(
+                uuid=uuid4(),
+                labels=["Entity"],
+                properties={"name": "Node2", "embedding": [-100.0, 0.0]},
+            ),
+        ]
+    )
+
+    results = await vector_graph_store_quantized.search_similar_nodes(
+        query_embedding=[1.0, 0.0],
+        embedding_property_name="embedding",
+        similarity_metric=SimilarityMetric.COSINE,
+        limit=5,
+        required_labels=["Entity"],
+    )
+    assert 0 < len(results) <= 2
+
+    records, _, _ = await neo4j_driver.execute_query(
+        "SHOW VECTOR INDEXES YIELD options "
+        "RETURN options.indexConfig.`vector.quantization.enabled` AS quantized"
+    )
+    assert [record["quantized"] for record in records] == [True]
+
 
 @pytest.mark.asyncio
 async def test_search_related_nodes(vector_graph_store):
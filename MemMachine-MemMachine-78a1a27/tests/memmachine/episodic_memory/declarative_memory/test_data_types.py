@@ -0,0 +1,35 @@
+import math
+
+import pytest
+
+from memmachine.episodic_memory.declarative_memory.data_types import (
+    dump_user_metadata,
+    load_user_metadata,
+)
+
+
+@pytest.mark.parametrize(
+    ("user_metadata", "expected"),
+    [
+        (None, None),
+        (
+            {"source": "chat", "tags": ["a", "b"]},
+            {"source": "chat", "tags": ["a", "b"]},
+        ),
+        # Non-string keys are converted to strings, as with json.dumps.
+        ({1: "one", 2.5: "half"}, {"1": "one", "2.5": "half"}),
+        # NaN and infinite floats are not valid JSON and are stored as null.
+        ({"score": math.nan, "limit": math.inf}, {"score": None, "limit": None}),
+    ],
+)
+def test_user_metadata_round_trip(user_metadata, expected):
+    assert load_user_metadata(dump_user_metadata(user_metadata)) == expected
+
+
+def test_load_user_metadata_written_by_json_dumps():
+    # Older versions wrote user metadata with json.dumps,
+    # which writes NaN and Infinity.
+    user_metadata = load_user_metadata('{"score": NaN, "limit": Infinity}')
+    assert isinstance(user_metadata, dict)
+    assert math.isnan(user_metadata["score"])
+    assert user_metadata["limit"] == math.inf
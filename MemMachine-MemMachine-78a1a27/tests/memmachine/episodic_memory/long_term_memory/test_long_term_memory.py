@@ -0,0 +1,66 @@
+import pytest
+
+from memmachine.episodic_memory.long_term_memory.long_term_memory import Neo4jConfig
+
+
+def test_neo4j_config_bolt_uri():
+    neo4j_config = Neo4jConfig.from_config(
+        {
+            "vendor_name": "neo4j",
+            "host": "localhost",
+            "port": 7687,
+            "user": "neo4j",
+            "password": "password",
+        }
+    )
+
+    assert neo4j_config.uri == "bolt://localhost:7687"
+    assert neo4j_config.username == "neo4j"
+    assert neo4j_config.password == "password"
+    assert neo4j_config.max_concurrent_transactions == 100
+    assert neo4j_config.force_exact_similarity_search is False
+    assert neo4j_config.vector_index_quantization_enabled is None
+
+
+def test_neo4j_config_secure_uri():
+    neo4j_config = Neo4jConfig.from_config(
+        {
+            "host": "neo4j+s://example.databases.neo4j.io",
+            "user": "neo4j",
+            "password": "password",
+            "force_exact_similarity_search": True,
+            "vector_index_quantization_enabled": True,
+        }
+    )
+
+    assert neo4j_config.uri == "neo4j+s://example.databases.neo4j.io"
+    assert neo4j_config.force_exact_similarity_search is True
+    assert neo4j_config.vector_index_quantization_enabled is True
+
+
+@pytest.mark.parametrize(
+    "vector_graph_store_config",
+    [
+        {"port": 7687, "user": "neo4j", "password": "password"},
+        {"host": "localhost", "user": "neo4j", "password": "password"},
+        {"host": "localhost", "port": "7687", "user": "neo4j", "password": "p"},
+        {"host": "localhost", "port": 7687, "password": "password"},
+        {"host": "localhost", "port": 7687, "user": "neo4j"},
+    ],
+)
+def test_neo4j_config_invalid(vector_graph_store_config):
+    with pytest.raises(TypeError):
+        Neo4jConfig.from_config(vector_graph_store_config)
+
+
+def test_neo4j_config_invalid_max_concurrent_transactions():
+    with pytest.raises(ValueError):
+        Neo4jConfig.from_config(
+            {
+                "host": "localhost",
+                "port": 7687,
+                "user": "neo4j",
+                "password": "password",
+                "max_concurrent_transactions": 0,
+            }
+        )
@@ -0,0 +1,81 @@
+"""Unit tests for the session database JSON column migration."""
+
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import String, create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+
+from memmachine.episodic_memory.session_manager import migrate_json_columns as module
+
+
+def postgresql_engine(column_types: dict[str, dict[str, object]]):
+    """Create a mock PostgreSQL engine and inspector for the given columns."""
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    inspector = MagicMock()
+    inspector.get_columns.side_effect = lambda table_name, schema: [
+        {"name": name, "type": column_type}
+        for name, column_type in column_types[table_name].items()
+    ]
+    return engine, inspector
+
+
+def executed_statements(engine) -> list[str]:
+    connection = engine.begin.return_value.__enter__.return_value
+    return [str(c.args[0]) for c in connection.execute.call_args_list]
+
+
+def test_migrate_string_columns():
+    """Test that only string columns are converted to JSONB."""
+    engine, inspector = postgresql_engine(
+        {
+            "sessions": {
+                "agent_ids": String(),
+                "user_ids": String(),
+                "configuration": String(),
+            },
+            "group_info": {
+                "agent_list": JSONB(),
+                "user_list": JSONB(),
+                "configuration": String(),
+            },
+        }
+    )
+    with patch.object(module, "inspect", return_value=inspector):
+        module.migrate_json_columns(engine, "memory")
+
+    assert executed_statements(engine) == [
+        'ALTER TABLE "memory"."sessions" ALTER COLUMN "agent_ids" TYPE JSONB'
+        ' USING "agent_ids"::jsonb',
+        'ALTER TABLE "memory"."sessions" ALTER COLUMN "user_ids" TYPE JSONB'
+        ' USING "user_ids"::jsonb',
+        'ALTER TABLE "memory"."sessions" ALTER COLUMN "configuration" TYPE JSONB'
+        ' USING "configuration"::jsonb',
+        'ALTER TABLE "memory"."group_info" ALTER COLUMN "configuration" TYPE JSONB'
+        ' USING "configuration"::jsonb',
+    ]
+
+
+def test_migrate_is_idempotent():
+    """Test that columns that are already JSONB are left unchanged."""
+    engine, inspector = postgresql_engine(
+        {
+            table_name: {column_name: JSONB() for column_name in column_names}
+            for table_name, column_names in module.json_columns.items()
+        }
+    )
+    with patch.object(module, "inspect", return_value=inspector):
+        module.migrate_json_columns(engine)
+
+    assert executed_statements(engine) == []
+
+
+def test_migrate_skips_sqlite():
+    """Test that SQLite databases are not altered."""
+    engine = create_engine("sqlite://")
+    try:
+        with patch.object(module, "inspect") as inspect:
+            module.migrate_json_columns(engine)
+        inspect.assert_not_called()
+    finally:
+        engine.dispose()
@@ -3,6 +3,7 @@
 import os
 
 import pytest
+from sqlalchemy import inspect, text
 
 from memmachine.episodic_memory.data_types import SessionInfo
 from memmachine.episodic_memory.session_manager.session_manager import (
@@ -229,6 +230,16 @@ def test_get_all_sessions(session_manager: SessionManager):
     assert session_ids == {"s1", "s2"}
 
 
+def test_iter_all_sessions(session_manager: SessionManager, monkeypatch):
+    """Test iterating over all sessions in batches."""
+    monkeypatch.setattr(SessionManager, "_yield_per", 2)
+    for i in range(5):
+        session_manager.create_session_if_not_exist("g1", ["a1"], ["u1"], f"s{i}")
+
+    session_ids = {s.session_id for s in session_manager.iter_all_sessions()}
+    assert session_ids == {f"s{i}" for i in range(5)}
+
+
 def test_get_session_by_user(session_manager: SessionManager):
     """Test retrieving sessions by user ID."""
     session_manager.create_session_if_not_exist("g1", ["a1"], ["u1", "u2"], "s1")
@@ -269,6 +280,17 @@ def test_get_session_by_group(session_manager: SessionManager):
     assert session_ids == {"s1", "s2"}
 
 
+def test_iter_session_by_group(session_manager: SessionManager, monkeypatch):
+    """Test iterating over sessions by group ID in batches."""
+    monkeypatch.setattr(SessionManager, "_yield_per", 2)
+    for i in range(5):
+        session_manager.create_session_if_not_exist("g1", ["a1"], ["u1"], f"s{i}")
+    session_manager.create_session_if_not_exist("g2", ["a2"], ["u2"], "s5")
+
+    session_ids = {s.session_id for s in session_manager.iter_session_by_group("g1")}
+    assert session_ids == {f"s{i}" for i in range(5)}
+
+
 def test_delete_session(session_manager: SessionManager):
     """Test deleting a session."""
     session_info = session_manager.create_session_if_not_exist(
@@ -310,6 +332,104 @@ def test_init_with_invalid_config():
         SessionManager({"uri": ""})
 
 
+@pytest.mark.parametrize(
+    "uri,database",
+    [
+        ("test_sessions.db", "test_sessions.db"),
+        ("sqlite:///test_sessions.db", "test_sessions.db"),
+        ("sqlite:///:memory:", ":memory:"),
+    ],
+)
+def test_init_sqlite_uri(session_manager: SessionManager, uri: str, database: str):
+    """Test that bare paths and SQLite URIs open a SQLite database."""
+    manager = SessionManager({"uri": uri})
+    assert manager._engine.url.get_backend_name() == "sqlite"
+    assert manager._engine.url.database == database
+
+    manager.create_new_group(group_id="g1", agent_ids=["a1"], user_ids=["u1"])
+    manager.create_session("g1", "s1")
+    assert manager.open_session("g1", "s1").agent_ids == ["a1"]
+
+
+def test_groups_are_shared_between_managers(session_manager: SessionManager):
+    """Test that group changes are visible to other managers of the database."""
+    other_manager = SessionManager({"uri": "sqlite:///test_sessions.db"})
+    session_manager.create_new_group(
+        group_id="g1",
+        agent_ids=["a1"],
+        user_ids=["u1"],
+    )
+    group = session_manager.retrieve_group("g1")
+    assert group is not None
+    group.agent_list.append("a2")
+
+    session_info = session_manager.create_session("g1", "s1")
+    assert session_info.agent_ids == ["a1"]
+
+    session_manager.delete_session("g1", "s1")
+    other_manager.delete_group("g1")
+    assert session_manager.retrieve_group("g1") is None
+    with pytest.raises(ValueError):
+        session_manager.create_session("g1", "s1")
+
+    other_manager.create_new_group(
+        group_id="g1",
+        agent_ids=["a3"],
+        user_ids=["u3"],
+    )
+    session_info = session_manager.create_session("g1", "s1")
+    assert session_info.agent_ids == ["a3"]
+    assert session_info.user_ids == ["u3"]
+
+
+def test_init_preserves_existing_database(session_manager: SessionManager):
+    """Test that reopening an existing database keeps its data."""
+    session_manager.create_new_group(
+        group_id="g1",
+        agent_ids=["a1"],
+        user_ids=["u1"],
+    )
+
+    reopened_manager = SessionManager({"uri": "sqlite:///test_sessions.db"})
+    group = reopened_manager.retrieve_group("g1")
+    assert group is not None
+    assert group.agent_list == ["a1"]
+    assert group.user_list == ["u1"]
+
+
+def test_init_adds_missing_indexes(session_manager: SessionManager):
+    """Test that reopening a database created without indexes adds them."""
+    with session_manager._engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_users_group_id_session_id"))
+        connection.execute(text("DROP INDEX ix_agents_group_id_session_id"))
+
+    reopened_manager = SessionManager({"uri": "sqlite:///test_sessions.db"})
+    inspector = inspect(reopened_manager._engine)
+    assert {index["name"] for index in inspector.get_indexes("users")} == {
+        "ix_users_group_id_session_id"
+    }
+    assert {index["name"] for index in inspector.get_indexes("agents")} == {
+        "ix_agents_group_id_session_id"
+    }
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * FROM users WHERE user_id = 'u1'",
+        "SELECT * FROM agents WHERE agent_id = 'a1'",
+        "SELECT * FROM sessions WHERE group_id = 'g1'",
+        "SELECT * FROM users WHERE group_id = 'g1' AND session_id = 's1'",
+        "SELECT * FROM agents WHERE group_id = 'g1' AND session_id = 's1'",
+    ],
+)
+def test_lookups_use_indexes(session_manager: SessionManager, query: str):
+    """Test that session lookups are backed by indexes."""
+    with session_manager._engine.connect() as connection:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {query}").all()
+    assert all("USING" in row[-1] and "INDEX" in row[-1] for row in plan)
+
+
 def test_create_session_with_null_config(session_manager: SessionManager):
     """Test creating a session with null configuration."""
     session_info = session_manager.create_session_if_not_exist(
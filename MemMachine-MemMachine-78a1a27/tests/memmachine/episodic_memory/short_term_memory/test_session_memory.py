@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
@@ -157,3 +158,169 @@ class TestSessionMemoryPublicAPI:
         )
         assert len(episodes) == 1
         assert episodes == [ep3]
+
+    async def test_token_cache_tracks_memory(self, memory):
+        """Test that cached token counts only cover episodes in memory."""
+        for i in range(7):
+            await memory.add_episode(create_test_episode(content=f"episode {i}"))
+            assert set(memory._token_cache) == {id(e) for e in memory._memory}
+
+        episodes, _ = await memory.get_session_memory_context(query="test")
+        assert set(memory._token_cache) == {id(e) for e in episodes}
+
+        await memory.clear_memory()
+        assert memory._token_cache == {}
+
+    async def test_summary_prompt(self, memory, mock_model):
+        """Test the episodes and metadata passed to the summary prompt."""
+        ep1 = create_test_episode(content="a", user_metadata={"k1": "v1", "k2": 2})
+        ep2 = create_test_episode(content="b", user_metadata="meta")
+        ep3 = create_test_episode(content="c")
+        await memory.add_episode(ep1)
+        await memory.add_episode(ep2)
+        await memory.add_episode(ep3)
+        await memory.get_session_memory_context(query="test")
+
+        mock_model.generate_response.assert_awaited_once_with(
+            system_prompt="System prompt",
+            user_prompt=(
+                f"User prompt: [{ep1.uuid} : [k1: v1] [k2: 2]  : a]"
+                f"[{ep2.uuid} : meta : b]"
+                f"[{ep3.uuid} :  : c] "
+            ),
+        )
+
+    async def test_clear_memory_cancels_summary(self, memory, mock_model):
+        """Test that clearing the memory cancels a pending summary."""
+        mock_model.generate_response = AsyncMock(side_effect=asyncio.Event().wait)
+        for i in range(3):
+            await memory.add_episode(create_test_episode(content=f"episode {i}"))
+        summary_task = memory._summary_task
+        assert summary_task is not None
+
+        await memory.clear_memory()
+        assert summary_task.cancelled()
+        episodes, summary = await memory.get_session_memory_context(query="test")
+        assert episodes == []
+        assert summary == ""
+
+    async def test_clear_memory_after_failed_summary(self, memory, mock_model):
+        """Test that clearing the memory does not raise a summary error."""
+        mock_model.generate_response = AsyncMock(side_effect=KeyError("summary"))
+        for i in range(3):
+            await memory.add_episode(create_test_episode(content=f"episode {i}"))
+        await asyncio.wait([memory._summary_task])
+
+        await memory.clear_memory()
+        episodes, summary = await memory.get_session_memory_context(query="test")
+        assert episodes == []
+        assert summary == ""
+
+    async def test_add_episode_during_retrieval(self, memory, mock_model):
+        """Test that an add during a retrieval does not wait for the summary."""
+        summary_ready = asyncio.Event()
+
+        async def generate_response(**kwargs):
+            await summary_ready.wait()
+            return ["summary"]
+
+        mock_model.generate_response = AsyncMock(side_effect=generate_response)
+        for i in range(3):
+            await memory.add_episode(create_test_episode(content=f"episode {i}"))
+
+        retrieval = asyncio.create_task(memory.get_session_memory_context(query="test"))
+        await asyncio.sleep(0)
+        episode = create_test_episode(content="episode 3")
+        assert not await asyncio.wait_for(memory.add_episode(episode), timeout=1)
+
+        # The retrieval finished before the episode was added.
+        episodes, _ = await retrieval
+        assert episode not in episodes
+
+        summary_ready.set()
+        episodes, summary = await memory.get_session_memory_context(query="test")
+        assert episodes[-1] is episode
+        assert summary == "summary"
+
+    async def test_concurrent_adds_during_retrieval_are_summarized(
+        self, memory, mock_model
+    ):
+        """Test that episodes added during a retrieval all reach a summary."""
+        summary_ready = asyncio.Event()
+
+        async def generate_response(**kwargs):
+            await summary_ready.wait()
+            return ["summary"]
+
+        mock_model.generate_response = AsyncMock(side_effect=generate_response)
+        for i in range(3):
+            await memory.add_episode(create_test_episode(content=f"episode {i}"))
+
+        retrieval = asyncio.create_task(memory.get_session_memory_context(query="test"))
+        await asyncio.sleep(0)
+        adds = [
+            memory.add_episode(create_test_episode(content=f"episode {i}"))
+            for i in range(3, 7)
+        ]
+        await asyncio.gather(retrieval, *adds)
+
+        summary_ready.set()
+        await memory._summary_task
+        prompts = "".join(
+            call.kwargs["user_prompt"]
+            for call in mock_model.generate_response.await_args_list
+        )
+        for i in range(6):
+            assert f"episode {i}]" in prompts
+
+    async def test_token_cache_is_bounded(self, memory):
+        """Test that the token cache never outgrows twice the capacity."""
+        episodes = [create_test_episode(content=f"episode {i}") for i in range(10)]
+        for episode in episodes:
+            memory._episode_tokens(episode)
+            assert len(memory._token_cache) <= 2 * memory._capacity
+        assert list(memory._token_cache) == [id(e) for e in episodes[-6:]]
+
+    async def test_retrieval_does_not_wait_for_slow_summary(self, memory, mock_model):
+        """Test that retrieval uses the previous summary until a new one is ready."""
+        summary_ready = asyncio.Event()
+
+        async def generate_response(**kwargs):
+            await summary_ready.wait()
+            return ["summary"]
+
+        mock_model.generate_response = AsyncMock(side_effect=generate_response)
+        for i in range(3):
+            await memory.add_episode(create_test_episode(content=f"episode {i}"))
+
+        _, summary = await asyncio.wait_for(
+            memory.get_session_memory_context(query="test"), timeout=1
+        )
+        assert summary == ""
+
+        summary_ready.set()
+        await asyncio.sleep(0)
+        _, summary = await memory.get_session_memory_context(query="test")
+        assert summary == "summary"
+
+    async def test_eviction_does_not_wait_for_summary(self, memory, mock_model):
+        """Test that evictions queue summaries instead of waiting for them."""
+        summary_ready = asyncio.Event()
+        summaries = iter(["summary 1", "summary 2"])
+
+        async def generate_response(**kwargs):
+            await summary_ready.wait()
+            return [next(summaries)]
+
+        mock_model.generate_response = AsyncMock(side_effect=generate_response)
+        for i in range(6):
+            episode = create_test_episode(content=f"episode {i}")
+            await asyncio.wait_for(memory.add_episode(episode), timeout=1)
+
+        summary_ready.set()
+        await memory._summary_task
+        _, summary = await memory.get_session_memory_context(query="test")
+        assert summary == "summary 2"
+        assert mock_model.generate_response.await_count == 2
+        second_prompt = mock_model.generate_response.await_args.kwargs["user_prompt"]
+        assert second_prompt.endswith(" summary 1")
@@ -344,13 +344,17 @@ class InMemoryProfileStorage(ProfileStorageBase):
         user_id: str,
         k: int = 0,
         is_ingested: bool = False,
+        order_by_isolations: bool = False,
     ) -> list[dict[str, Any]]:
-        return await self._get_history_messages(
+        rows = await self._get_history_messages(
             user_id=user_id,
             k=k,
             is_ingested=is_ingested,
             isolations=None,
         )
+        if order_by_isolations:
+            rows.sort(key=lambda row: row["isolations"])
+        return rows
 
     async def get_uningested_history_messages_count(self) -> int:
         async with self._lock:
@@ -1,8 +1,9 @@
 """Unit tests for the profile_memory module."""
 
 import asyncio
+import json
 import time
-from unittest.mock import create_autospec
+from unittest.mock import call, create_autospec, patch
 
 import pytest
 import pytest_asyncio
@@ -13,6 +14,9 @@ from memmachine.profile_memory.profile_memory import (
     ProfileMemory,
     ProfileUpdateTracker,
     ProfileUpdateTrackerManager,
+    _find_json_object,
+    _isolations_key,
+    _sanitize_llm_json,
 )
 from memmachine.profile_memory.prompt_provider import ProfilePrompt
 from memmachine.profile_memory.storage.storage_base import ProfileStorageBase
@@ -87,6 +91,26 @@ async def test_profile_update_tracker_manager_with_time_limit(
     assert set(users) == {"a", "b"}
 
 
+async def test_profile_update_tracker_manager_skips_stale_deadline(
+    profile_update_tracker_manager,
+):
+    for user in ["a", "a"]:
+        await profile_update_tracker_manager.mark_update(user)
+    users = await profile_update_tracker_manager.get_users_to_update()
+    assert users == ["a"]
+
+    time.sleep(0.06)
+    await profile_update_tracker_manager.mark_update("a")
+    time.sleep(0.06)
+    # The deadline from before the reset has passed, the new one has not.
+    users = await profile_update_tracker_manager.get_users_to_update()
+    assert users == []
+
+    time.sleep(0.06)
+    users = await profile_update_tracker_manager.get_users_to_update()
+    assert users == ["a"]
+
+
 @pytest.fixture
 def mock_embedder():
     embedder = FakeEmbedder()
@@ -136,6 +160,47 @@ async def profile_memory(
     await pm.cleanup()
 
 
+def test_isolations_key():
+    assert _isolations_key({}) == ()
+    assert _isolations_key({"a": 1, "b": "x"}) == _isolations_key({"b": "x", "a": 1})
+    assert _isolations_key({"a": 1}) != _isolations_key({"a": True})
+    assert _isolations_key({"a": 1}) != _isolations_key({"a": "1"})
+
+
+async def test_range_filter(profile_memory: ProfileMemory):
+    assert profile_memory.range_filter([], max_range=2.0, max_std=1.0) == []
+    single = [(0.5, "a")]
+    assert profile_memory.range_filter(single, max_range=0.1, max_std=0.1) == ["a"]
+    assert profile_memory.range_filter(single, max_range=0.0, max_std=0.1) == []
+
+    arr = [(0.9, "a"), (0.8, "b"), (0.7, "c"), (-0.9, "d")]
+    # The prefix stops before the outlier raises the standard deviation.
+    assert profile_memory.range_filter(arr, max_range=2.0, max_std=0.5) == [
+        "a",
+        "b",
+        "c",
+    ]
+    # Entries too far below the best score are dropped.
+    assert profile_memory.range_filter(arr, max_range=0.15, max_std=1.0) == [
+        "a",
+        "b",
+    ]
+    assert profile_memory.range_filter(arr, max_range=2.0, max_std=0.0) == []
+
+
+async def test_semantic_search_caches_query_embedding(
+    profile_memory: ProfileMemory, mock_embedder
+):
+    with patch.object(
+        mock_embedder, "search_embed", wraps=mock_embedder.search_embed
+    ) as search_embed:
+        for _ in range(2):
+            await profile_memory.semantic_search("pets", user_id="test_user")
+        await profile_memory.semantic_search("food", user_id="test_user")
+
+    assert search_embed.await_args_list == [call(["pets"]), call(["food"])]
+
+
 @pytest_asyncio.fixture
 async def single_feature_profile_response(profile_memory):
     await profile_memory.add_new_profile(
@@ -389,3 +454,332 @@ async def test_persona_think_updates_profile(
     )
 
     assert profile == mock_persona_think_response
+
+
+async def test_update_profile_embeds_values_in_one_request(
+    profile_memory: ProfileMemory, mock_llm, mock_embedder
+):
+    mock_llm.generate_response.return_value = (
+        """{
+      "1": {"command": "add", "feature": "pet", "value": "dog", "tag": "likes"},
+      "2": {"command": "add", "feature": "food", "value": "pizza", "tag": "likes"}
+    }""",
+        [],
+    )
+    with patch.object(
+        mock_embedder, "ingest_embed", wraps=mock_embedder.ingest_embed
+    ) as ingest_embed:
+        await profile_memory._update_user_profile_think(
+            {"id": 1, "user_id": "test_user", "isolations": "{}", "content": "hi"}
+        )
+
+    ingest_embed.assert_awaited_once_with(["dog", "pizza"])
+    profile = await profile_memory.get_user_profile(user_id="test_user")
+    assert profile == {
+        "likes": {"pet": {"value": "dog"}, "food": {"value": "pizza"}},
+    }
+
+
+@pytest.mark.parametrize(
+    "response_text",
+    [
+        '<think>The user has a dog.</think>{"1": {"command": "add", '
+        '"feature": "pet", "value": "dog", "tag": "likes"}}',
+        'Here is the update:\n```json\n{"1": {"command": "add", '
+        '"feature": "pet", "value": "dog", "tag": "likes",}}\n```',
+        '{"1": {"command": "add", "feature": "pet", "value": "dog", '
+        '"tag": "likes"}, "2": "a { in a string"}',
+    ],
+)
+async def test_update_profile_extracts_json(
+    profile_memory: ProfileMemory, mock_llm, response_text
+):
+    mock_llm.generate_response.return_value = (response_text, [])
+    await profile_memory._update_user_profile_think(
+        {"id": 1, "user_id": "test_user", "isolations": "{}", "content": "hi"}
+    )
+
+    profile = await profile_memory.get_user_profile(user_id="test_user")
+    assert profile == {"likes": {"pet": {"value": "dog"}}}
+
+
+async def test_deduplicate_profile_skips_malformed_memories(
+    profile_memory: ProfileMemory, mock_llm
+):
+    valid = {"tag": "likes", "feature": "pet", "value": "dog"}
+    consolidate_memories = [
+        {**valid, "metadata": {"citations": []}},
+        {**valid, "feature": "food", "value": 1, "metadata": {"citations": []}},
+        {**valid, "feature": "food", "metadata": {"citations": ["one"]}},
+        {**valid, "feature": "food", "metadata": {"citations": 1}},
+        {**valid, "feature": "food"},
+        "food: pizza",
+        # Int-like citations are coerced rather than rejected.
+        {
+            **valid,
+            "feature": "toy",
+            "value": "ball",
+            "metadata": {"citations": ["1", 2.0]},
+        },
+    ]
+    mock_llm.generate_response.return_value = (
+        json.dumps({"consolidate_memories": consolidate_memories, "keep_memories": []}),
+        [],
+    )
+    await profile_memory._deduplicate_profile("test_user", [])
+
+    profile = await profile_memory.get_user_profile(user_id="test_user")
+    assert profile == {"likes": {"pet": {"value": "dog"}, "toy": {"value": "ball"}}}
+
+
+async def test_deduplicate_profile_keeps_agreeing_isolations(
+    profile_memory: ProfileMemory, mock_llm
+):
+    for value, isolations in [("pizza", {"a": 1, "b": 1}), ("pasta", {"a": 1, "b": 2})]:
+        history = await profile_memory._profile_storage.add_history(
+            "test_user", value, {}, isolations
+        )
+        await profile_memory.add_new_profile(
+            user_id="test_user",
+            feature="food",
+            value=value,
+            tag="likes",
+            isolations=isolations,
+            citations=[history["id"]],
+        )
+    [section] = await profile_memory.get_large_profile_sections(
+        user_id="test_user", thresh=2, isolations={"a": 1}
+    )
+    memory_ids = [m["metadata"]["id"] for m in section]
+
+    mock_llm.generate_response.return_value = (
+        '{"consolidate_memories": [{"tag": "likes", "feature": "cuisine", '
+        '"value": "italian", "metadata": {"citations": '
+        f"{memory_ids}}}}}], "
+        f'"keep_memories": {memory_ids}}}',
+        [],
+    )
+    await profile_memory._deduplicate_profile("test_user", section)
+
+    # The consolidated feature keeps only the isolations its sources agree on.
+    assert await profile_memory.get_user_profile("test_user", {"a": 1}) == {
+        "likes": {
+            "food": [{"value": "pizza"}, {"value": "pasta"}],
+            "cuisine": {"value": "italian"},
+        },
+    }
+    assert await profile_memory.get_user_profile("test_user", {"b": 1}) == {
+        "likes": {"food": {"value": "pizza"}},
+    }
+
+
+async def test_update_profile_skips_invalid_commands(
+    profile_memory: ProfileMemory, mock_llm
+):
+    mock_llm.generate_response.return_value = (
+        """{
+      "1": {"command": "add", "feature": "pet", "value": "dog", "tag": "likes"},
+      "2": {"command": "add", "feature": "food", "tag": "likes"},
+      "3": {"command": "rename", "feature": "pet", "tag": "likes"},
+      "4": {"command": ["add"], "feature": "pet", "tag": "likes"},
+      "5": "add a cat"
+    }""",
+        [],
+    )
+    await profile_memory._update_user_profile_think(
+        {"id": 1, "user_id": "test_user", "isolations": "{}", "content": "hi"}
+    )
+
+    profile = await profile_memory.get_user_profile(user_id="test_user")
+    assert profile == {"likes": {"pet": {"value": "dog"}}}
+
+
+async def test_update_profile_extracts_json_objects_from_malformed_response(
+    profile_memory: ProfileMemory, mock_llm
+):
+    mock_llm.generate_response.return_value = (
+        "```json\n"
+        '{"1": {"command": "add", "feature": "pet", "value": "dog", "tag": "likes"}}\n'
+        "{broken\n"
+        '{"2": {"command": "add", "feature": "food", "value": "{pizza}", '
+        '"tag": "likes"}}\n'
+        "```",
+        [],
+    )
+    await profile_memory._update_user_profile_think(
+        {"id": 1, "user_id": "test_user", "isolations": "{}", "content": "hi"}
+    )
+
+    profile = await profile_memory.get_user_profile(user_id="test_user")
+    assert profile == {
+        "likes": {"pet": {"value": "dog"}, "food": {"value": "{pizza}"}},
+    }
+
+
+async def test_deduplicate_profile(profile_memory: ProfileMemory, mock_llm):
+    for feature, value in [("pet", "dog"), ("food", "pizza")]:
+        await profile_memory.add_new_profile(
+            user_id="test_user", feature=feature, value=value, tag="likes"
+        )
+    [section] = await profile_memory.get_large_profile_sections(
+        user_id="test_user", thresh=2
+    )
+    pet_id = next(m["metadata"]["id"] for m in section if m["feature"] == "pet")
+
+    mock_llm.generate_response.return_value = (
+        "<think>Merge the food entries.</think>"
+        '{"consolidate_memories": [{"tag": "likes", "feature": "food", '
+        '"value": "pizza and pasta", "metadata": {"citations": []}}], '
+        f'"keep_memories": [{pet_id}]}}',
+        [],
+    )
+    await profile_memory._deduplicate_profile("test_user", section)
+
+    profile = await profile_memory.get_user_profile(user_id="test_user")
+    assert profile == {
+        "likes": {"pet": {"value": "dog"}, "food": {"value": "pizza and pasta"}},
+    }
+
+
+async def test_deduplicate_profile_invalidates_cached_profile(
+    profile_memory: ProfileMemory, mock_llm
+):
+    for feature, value in [("pet", "dog"), ("food", "pizza")]:
+        await profile_memory.add_new_profile(
+            user_id="test_user", feature=feature, value=value, tag="likes"
+        )
+    [section] = await profile_memory.get_large_profile_sections(
+        user_id="test_user", thresh=2
+    )
+    pet_id = next(m["metadata"]["id"] for m in section if m["feature"] == "pet")
+    # Cache the profile before consolidation.
+    await profile_memory.get_user_profile(user_id="test_user")
+
+    mock_llm.generate_response.return_value = (
+        f'{{"consolidate_memories": [], "keep_memories": [{pet_id}]}}',
+        [],
+    )
+    await profile_memory._deduplicate_profile("test_user", section)
+
+    profile = await profile_memory.get_user_profile(user_id="test_user")
+    assert profile == {"likes": {"pet": {"value": "dog"}}}
+
+
+async def test_deduplicate_profile_keeps_well_formed_json(
+    profile_memory: ProfileMemory, mock_llm
+):
+    # Braces inside strings must not be "fixed" when the JSON parses as is.
+    mock_llm.generate_response.return_value = (
+        "<think>Keep the emoticon.</think>"
+        '{"consolidate_memories": [{"tag": "likes", "feature": "emoticon", '
+        '"value": ":-{", "metadata": {"citations": []}}], "keep_memories": []}',
+        [],
+    )
+    await profile_memory._deduplicate_profile("test_user", [])
+
+    profile = await profile_memory.get_user_profile(user_id="test_user")
+    assert profile == {"likes": {"emoticon": {"value": ":-{"}}}
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("{tag: 'likes', `feature`: \"pet\"}", '{"tag": "likes", "feature": "pet"}'),
+        ('{"a": [1, 2,], "b": 1, ... (more)\n}', '{"a": [1, 2], "b": 1 \n}'),
+        ('{"value": "Ann\'s site: http://a.b, `x`"}', None),
+        ("Note: {1: {tag : 'likes'}}", 'Note: {"1": {"tag": "likes"}}'),
+    ],
+)
+def test_sanitize_llm_json(text, expected):
+    assert _sanitize_llm_json(text) == (text if expected is None else expected)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        (
+            'The update is {"a": {"b": {"c": 1}}} and {"d": 2}.',
+            '{"a": {"b": {"c": 1}}}',
+        ),
+        ('{ unmatched {"a": 1} }', '{ unmatched {"a": 1} }'),
+        ('{ unmatched {"a": 1}', '{"a": 1}'),
+        ("} no object {", None),
+        ("{" * 10_000, None),
+    ],
+)
+def test_find_json_object(text, expected):
+    assert _find_json_object(text) == expected
+
+
+async def test_mark_ingested_overlaps_next_update(
+    profile_memory: ProfileMemory, mock_llm
+):
+    events = []
+
+    async def generate_response(**kwargs):
+        events.append("update started")
+        await asyncio.sleep(0.01)
+        events.append("update finished")
+        return "{}", []
+
+    mock_llm.generate_response.side_effect = generate_response
+    storage = profile_memory._profile_storage
+    mark_messages_ingested = storage.mark_messages_ingested
+
+    async def record_mark(ids):
+        events.append("marked")
+        await mark_messages_ingested(ids)
+
+    for i in range(2):
+        await storage.add_history("test_user", f"message {i}", {}, {})
+
+    with patch.object(storage, "mark_messages_ingested", side_effect=record_mark):
+        await profile_memory._process_uningested_memories("test_user")
+
+    # The first message is marked while the second one is being processed.
+    assert events == [
+        "update started",
+        "update finished",
+        "update started",
+        "marked",
+        "update finished",
+        "marked",
+    ]
+    assert await profile_memory.uningested_message_count() == 0
+
+
+async def test_process_uningested_memories_sequentially_per_group(
+    profile_memory: ProfileMemory, mock_llm
+):
+    # Isolation groups run concurrently, but the messages of each group
+    # are processed one at a time.
+    in_flight = {"group 0": 0, "group 1": 0}
+    max_in_flight = {"group 0": 0, "group 1": 0}
+    total_in_flight = 0
+    max_total_in_flight = 0
+
+    async def generate_response(**kwargs):
+        nonlocal total_in_flight, max_total_in_flight
+        group = "group 0" if "group 0" in kwargs["user_prompt"] else "group 1"
+        in_flight[group] += 1
+        total_in_flight += 1
+        max_in_flight[group] = max(max_in_flight[group], in_flight[group])
+        max_total_in_flight = max(max_total_in_flight, total_in_flight)
+        await asyncio.sleep(0.01)
+        in_flight[group] -= 1
+        total_in_flight -= 1
+        return "{}", []
+
+    mock_llm.generate_response.side_effect = generate_response
+    for i in range(3):
+        for g in range(2):
+            await profile_memory._profile_storage.add_history(
+                "test_user", f"group {g} message {i}", {}, {"group": g}
+            )
+
+    await profile_memory._process_uningested_memories("test_user")
+
+    assert mock_llm.generate_response.await_count == 6
+    assert max_in_flight == {"group 0": 1, "group 1": 1}
+    assert max_total_in_flight == 2
+    assert await profile_memory.uningested_message_count() == 0
@@ -0,0 +1,48 @@
+import pytest
+
+from memmachine.profile_memory.util.lru_cache import LRUCache
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        LRUCache(0)
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_put_updates_existing_key():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 3)
+
+    cache.put("c", 4)
+    assert cache.get("a") == 3
+    assert cache.get("b") is None
+
+
+def test_erase():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.erase("a")
+    cache.erase("missing")
+    assert cache.get("a") is None
+
+
+def test_clear():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.get("b") is None